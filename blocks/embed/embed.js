@@ -4,6 +4,8 @@
  * https://www.hlx.live/developer/block-collection/embed
  */
 
+import { whenIntersecting } from '../../scripts/scheduler.js';
+
 const loadScript = (url, callback, type) => {
   const head = document.querySelector('head');
   const script = document.createElement('script');
@@ -102,12 +104,6 @@ export default function decorate(block) {
     });
     block.append(wrapper);
   } else {
-    const observer = new IntersectionObserver((entries) => {
-      if (entries.some((e) => e.isIntersecting)) {
-        observer.disconnect();
-        loadEmbed(block, link);
-      }
-    });
-    observer.observe(block);
+    whenIntersecting(block).then(() => loadEmbed(block, link));
   }
 }
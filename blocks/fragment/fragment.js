@@ -12,28 +12,125 @@ import {
   loadBlocks,
 } from '../../scripts/aem.js';
 
+const FRAGMENT_CACHE_SIZE = 20;
+const FRAGMENT_STORAGE_PREFIX = 'fragment:';
+// only the fragments on every page are kept across pages, and only small ones,
+// so they never crowd the config cache out of sessionStorage
+const STORED_FRAGMENTS = /\/(nav|footer)$/;
+const FRAGMENT_STORAGE_MAX_LENGTH = 50000;
+
+// path => Promise of the decorated fragment, most recently used last
+const fragmentTemplates = new Map();
+
+function readStoredFragment(path) {
+  try {
+    return sessionStorage.getItem(`${FRAGMENT_STORAGE_PREFIX}${path}`);
+  } catch (error) {
+    return null;
+  }
+}
+
+function isStoredFragment(path) {
+  return STORED_FRAGMENTS.test(path);
+}
+
+function storeFragment(path, html) {
+  const key = `${FRAGMENT_STORAGE_PREFIX}${path}`;
+  try {
+    if (html === null || html.length > FRAGMENT_STORAGE_MAX_LENGTH) {
+      // deleted, unreadable or too large, stop serving the old copy
+      sessionStorage.removeItem(key);
+    } else {
+      sessionStorage.setItem(key, html);
+    }
+  } catch (error) {
+    // storage full or disabled, the fragment is fetched again on the next page
+  }
+}
+
+/**
+ * Fetches the html of a fragment. For nav and footer, a copy kept earlier in the session
+ * is used straight away while the fetch refreshes it for the next page.
+ * @param {string} path The path to the fragment
+ * @returns {Promise<string|null>} The html, or null if the fragment could not be fetched
+ */
+async function fetchFragmentHtml(path) {
+  const request = fetch(`${path}.plain.html`)
+    .then((resp) => (resp.ok ? resp.text() : null))
+    .catch(() => null);
+  if (!isStoredFragment(path)) return request;
+  request.then((html) => storeFragment(path, html));
+  return readStoredFragment(path) ?? request;
+}
+
+async function parseFragment(path) {
+  const html = await fetchFragmentHtml(path);
+  if (html === null) return null;
+  const main = document.createElement('main');
+  main.innerHTML = html;
+
+  // reset base path for media to fragment base
+  const resetAttributeBase = (tag, attr) => {
+    main.querySelectorAll(`${tag}[${attr}^="./media_"]`).forEach((elem) => {
+      elem[attr] = new URL(elem.getAttribute(attr), new URL(path, window.location)).href;
+    });
+  };
+  resetAttributeBase('img', 'src');
+  resetAttributeBase('source', 'srcset');
+
+  decorateMain(main);
+  return main;
+}
+
+/**
+ * Gets the decorated but not yet loaded fragment, fetching and parsing each path only once.
+ * Concurrent callers share the same request.
+ * @param {string} path The path to the fragment
+ * @returns {Promise<HTMLElement|null>} The fragment main, to be cloned and not modified
+ */
+function getFragmentTemplate(path) {
+  let template = fragmentTemplates.get(path);
+  if (template) {
+    fragmentTemplates.delete(path);
+  } else {
+    template = parseFragment(path);
+    template.then((main) => {
+      if (!main && fragmentTemplates.get(path) === template) fragmentTemplates.delete(path);
+    });
+  }
+  fragmentTemplates.set(path, template);
+  if (fragmentTemplates.size > FRAGMENT_CACHE_SIZE) {
+    fragmentTemplates.delete(fragmentTemplates.keys().next().value);
+  }
+  return template;
+}
+
+/**
+ * Fetches and parses a fragment ahead of its use, eg. when a modal link is hovered.
+ * @param {string} path The path to the fragment
+ */
+export function prefetchFragment(path) {
+  if (path && path.startsWith('/')) getFragmentTemplate(path);
+}
+
 /**
  * Loads a fragment.
+ * Blocks are loaded on a copy of the cached fragment, so each use gets its own event handlers.
  * @param {string} path The path to the fragment
+ * @param {Array<string>} [ancestors] Paths of the pages and fragments this one is included from
  * @returns {HTMLElement} The root element of the fragment
  */
-export async function loadFragment(path) {
+export async function loadFragment(path, ancestors = []) {
   if (path && path.startsWith('/')) {
-    const resp = await fetch(`${path}.plain.html`);
-    if (resp.ok) {
-      const main = document.createElement('main');
-      main.innerHTML = await resp.text();
-
-      // reset base path for media to fragment base
-      const resetAttributeBase = (tag, attr) => {
-        main.querySelectorAll(`${tag}[${attr}^="./media_"]`).forEach((elem) => {
-          elem[attr] = new URL(elem.getAttribute(attr), new URL(path, window.location)).href;
-        });
-      };
-      resetAttributeBase('img', 'src');
-      resetAttributeBase('source', 'srcset');
-
-      decorateMain(main);
+    if (ancestors.includes(path)) {
+      // eslint-disable-next-line no-console
+      console.warn(`fragment ${path} includes itself through ${ancestors.join(' > ')}`);
+      return null;
+    }
+    const template = await getFragmentTemplate(path);
+    if (template) {
+      const main = template.cloneNode(true);
+      main.dataset.fragmentPaths = [...ancestors, path].join(' ');
       await loadBlocks(main);
       return main;
     }
@@ -44,7 +141,9 @@ export async function loadFragment(path) {
 export default async function decorate(block) {
   const link = block.querySelector('a');
   const path = link ? link.getAttribute('href') : block.textContent.trim();
-  const fragment = await loadFragment(path);
+  const ancestors = block.closest('main[data-fragment-paths]')?.dataset.fragmentPaths.split(' ')
+    || [window.location.pathname];
+  const fragment = await loadFragment(path, ancestors);
   if (fragment) {
     const fragmentSection = fragment.querySelector(':scope .section');
     if (fragmentSection) {
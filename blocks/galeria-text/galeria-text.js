@@ -1,3 +1,5 @@
+import { observeIntersection } from '../../scripts/scheduler.js';
+
 function showSlide(block, slideIndex) {
   const slides = block.querySelectorAll('.galeria-text-slide');
   let realIndex = slideIndex < 0 ? slides.length - 1 : slideIndex;
@@ -23,17 +25,13 @@ function bindEvents(block) {
     showSlide(block, parseInt(block.dataset.activeSlide, 10) + 1);
   });
 
-  const slideObserver = new IntersectionObserver((entries) => {
-    entries.forEach((entry) => {
+  block.querySelectorAll('.galeria-text-slide').forEach((slide) => {
+    observeIntersection(slide, (entry) => {
       if (entry.isIntersecting) {
         const slideIndex = parseInt(entry.target.dataset.slideIndex, 10);
         block.dataset.activeSlide = slideIndex;
       }
-    });
-  }, { threshold: 0.5 });
-
-  block.querySelectorAll('.galeria-text-slide').forEach((slide) => {
-    slideObserver.observe(slide);
+    }, { threshold: 0.5 });
   });
 }
 
@@ -3,6 +3,7 @@
 /* eslint-disable no-use-before-define */
 import { fetchPlaceholders, getMetadata } from '../../scripts/aem.js';
 import { loadFragment } from '../fragment/fragment.js';
+import { onScroll } from '../../scripts/scheduler.js';
 
 function closeOnEscape(e) {
   if (e.code === 'Escape') {
@@ -310,19 +311,26 @@ export default async function decorate(block) {
   // Hide logo on scroll down and reveal on scroll up
   function fadeNavBrandOnScroll() {
     let lastScrollTop = 0;
+    let opacity = '1';
+
+    // the scheduler reads scrollY once per frame, only the opacity is written here
+    onScroll({
+      write: ({ scrollY: scrollTop }) => {
+        let nextOpacity = opacity;
+        if (scrollTop > 200 && scrollTop > lastScrollTop) {
+          // Scrolling down
+          nextOpacity = '0';
+        } else if (scrollTop < 200) {
+          // Scrolling up and reaching minimum offset of 200px
+          nextOpacity = '1';
+        }
+        if (nextOpacity !== opacity) {
+          opacity = nextOpacity;
+          navBrand.style.opacity = opacity;
+        }
 
-    window.addEventListener('scroll', () => {
-      const scrollTop = window.pageYOffset || document.documentElement.scrollTop;
-
-      if (scrollTop > 200 && scrollTop > lastScrollTop) {
-        // Scrolling down
-        navBrand.style.opacity = '0';
-      } else if (scrollTop < 200) {
-        // Scrolling up and reaching minimum offset of 200px
-        navBrand.style.opacity = '1';
-      }
-
-      lastScrollTop = scrollTop <= 0 ? 0 : scrollTop; // For Mobile or negative scrolling
+        lastScrollTop = scrollTop <= 0 ? 0 : scrollTop; // For Mobile or negative scrolling
+      },
     });
   }
 
@@ -1,13 +1,14 @@
+import { setLCPCandidate } from '../../scripts/aem.js';
+
 export default function decorate(block) {
   const elemant = block.querySelectorAll('p');
   const imageWrapper = document.createElement('div');
   imageWrapper.classList.add('image');
 
-  // Optimize LCP image: add fetchpriority="high" and loading="eager"
+  // Optimize LCP image: the hero image is the page's LCP candidate
   const img = block.querySelector('img');
   if (img) {
-    img.setAttribute('fetchpriority', 'high');
-    img.setAttribute('loading', 'eager');
+    setLCPCandidate(img);
   }
 
   // Always convert the second paragraph to h1 (original functionality)
@@ -3,6 +3,8 @@
  * A fixed bottom navigation bar with sibling page links
  */
 
+import { onScroll } from '../../scripts/scheduler.js';
+
 // Configuration object for the menu-podreczne block
 const MENU_PODRECZNE_CONFIG = {
   SCROLL_THRESHOLD: 0,
@@ -166,8 +168,7 @@ function handleScrollBehavior(menuContainer) {
   let lastScrollY = window.scrollY;
   let isVisible = false;
 
-  function updateMenuVisibility() {
-    const currentScrollY = window.scrollY;
+  function updateMenuVisibility({ scrollY: currentScrollY }) {
     const scrollDirection = currentScrollY > lastScrollY ? 'down' : 'up';
 
     if (scrollDirection === 'down' && currentScrollY > MENU_PODRECZNE_CONFIG.SCROLL_THRESHOLD && !isVisible) {
@@ -185,19 +186,8 @@ function handleScrollBehavior(menuContainer) {
     lastScrollY = currentScrollY;
   }
 
-  // Throttled scroll handler
-  let ticking = false;
-  function onScroll() {
-    if (!ticking) {
-      requestAnimationFrame(() => {
-        updateMenuVisibility();
-        ticking = false;
-      });
-      ticking = true;
-    }
-  }
-
-  window.addEventListener('scroll', onScroll, { passive: true });
+  // runs once per frame from the shared scroll scheduler
+  onScroll({ write: updateMenuVisibility });
 }
 
 /**
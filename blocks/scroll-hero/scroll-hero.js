@@ -3,12 +3,17 @@
  * Parallax cover scroll animation with GSAP ScrollTrigger
  */
 
+import { setLCPCandidate } from '../../scripts/aem.js';
+import { observeIntersection, whenIntersecting } from '../../scripts/scheduler.js';
+
 // =============================================================================
 // CONFIGURATION
 // =============================================================================
 
 const CONFIG = {
   gsapBaseURL: 'https://cdnjs.cloudflare.com/ajax/libs/gsap/3.12.2/',
+  gsapRootMargin: '100% 0px', // start loading GSAP a viewport height before the block
+  backgroundWidths: [750, 1200, 2000], // renditions used for the section backgrounds
   scrollPerSection: 1.5, // viewport heights per section
   animationPhases: {
     reveal: 0.4, // 40% of scroll for section reveal
@@ -61,6 +66,8 @@ const updateProgressNav = (activeIndex) => {
 const loadScript = (src) => new Promise((resolve, reject) => {
   const script = document.createElement('script');
   script.src = src;
+  // scripts added together download in parallel but still run in insertion order
+  script.async = false;
   script.onload = resolve;
   script.onerror = reject;
   document.head.appendChild(script);
@@ -125,10 +132,55 @@ const getSectionImages = (section) => {
   return { logoImage: '', bgImageSrc: images[0] || section.image };
 };
 
+/**
+ * Returns the smallest background rendition covering the viewport, as webp
+ * @param {string} src - Image URL
+ * @returns {string} - Rendition URL
+ */
+const getBackgroundURL = (src) => {
+  const { backgroundWidths } = CONFIG;
+  const needed = window.innerWidth * (window.devicePixelRatio || 1);
+  const width = backgroundWidths.find((w) => w >= needed) || backgroundWidths.at(-1);
+  const { pathname } = new URL(src, window.location.origin);
+  return `${pathname}?width=${width}&format=webply&optimize=medium`;
+};
+
+/**
+ * Shows the background image of a section element
+ * @param {HTMLElement} element - Section element
+ * @param {Object} section - Section data
+ * @returns {string} - The background URL, empty when the section has none
+ */
+const showSectionBackground = (element, section) => {
+  const bgElement = element?.querySelector(SELECTORS.backgroundImage);
+  const { bgImageSrc } = getSectionImages(section);
+  if (!bgElement || !bgImageSrc) return '';
+  const url = getBackgroundURL(bgImageSrc);
+  bgElement.style.backgroundImage = `url(${url})`;
+  bgElement.style.display = 'block';
+  return url;
+};
+
 // =============================================================================
 // GSAP LOADING
 // =============================================================================
 
+// global name and file of each GSAP module, in execution order
+const GSAP_MODULES = [
+  ['gsap', 'gsap.min.js'],
+  ['ScrollTrigger', 'ScrollTrigger.min.js'],
+  ['ScrollToPlugin', 'ScrollToPlugin.min.js'],
+];
+
+/**
+ * Loads the GSAP modules that are not loaded yet, all in parallel
+ * @param {string} baseURL - Folder holding the module files
+ * @returns {Promise} - Resolves when every module loaded
+ */
+const loadGSAPModules = (baseURL) => Promise.all(GSAP_MODULES
+  .filter(([name]) => !window[name])
+  .map(([, file]) => loadScript(`${baseURL}${file}`)));
+
 /**
  * Loads GSAP libraries if not already loaded
  * @returns {Promise<boolean>} - True if loaded successfully
@@ -137,17 +189,8 @@ const loadGSAPLibraries = async () => {
   const { gsapBaseURL } = CONFIG;
 
   try {
-    if (!window.gsap) {
-      await loadScript(`${gsapBaseURL}gsap.min.js`);
-    }
-    if (!window.ScrollTrigger) {
-      await loadScript(`${gsapBaseURL}ScrollTrigger.min.js`);
-      window.gsap.registerPlugin(window.ScrollTrigger);
-    }
-    if (!window.ScrollToPlugin) {
-      await loadScript(`${gsapBaseURL}ScrollToPlugin.min.js`);
-      window.gsap.registerPlugin(window.ScrollToPlugin);
-    }
+    await loadGSAPModules(gsapBaseURL);
+    window.gsap.registerPlugin(window.ScrollTrigger, window.ScrollToPlugin);
     return true;
   } catch {
     return false;
@@ -174,20 +217,14 @@ const initBasicScroll = () => {
     });
   });
 
-  // Intersection observer for progress updates
-  const observer = new IntersectionObserver(
-    (entries) => {
-      entries.forEach((entry) => {
-        if (entry.isIntersecting) {
-          const index = Array.from(sections).indexOf(entry.target);
-          updateProgressNav(index);
-        }
-      });
-    },
-    { threshold: 0.5 },
-  );
-
-  sections.forEach((section) => observer.observe(section));
+  // Shared intersection observer for progress updates
+  sections.forEach((section, index) => {
+    observeIntersection(section, (entry) => {
+      if (entry.isIntersecting) {
+        updateProgressNav(index);
+      }
+    }, { threshold: 0.5 });
+  });
 };
 
 // =============================================================================
@@ -399,16 +436,7 @@ const initScrollAnimations = (sections) => {
 
   // Set background images
   sections.forEach((section, index) => {
-    const element = sectionElements[index];
-    const bgElement = element?.querySelector(SELECTORS.backgroundImage);
-
-    if (bgElement) {
-      const { bgImageSrc } = getSectionImages(section);
-      if (bgImageSrc) {
-        bgElement.style.backgroundImage = `url(${bgImageSrc})`;
-        bgElement.style.display = 'block';
-      }
-    }
+    showSectionBackground(sectionElements[index], section);
   });
 
   // Initialize parallax
@@ -542,11 +570,18 @@ export default async function decorate(block) {
   block.appendChild(createProgressNav(sections));
   block.appendChild(container);
 
-  // Initialize animations after DOM is ready
-  const gsapLoaded = await loadGSAPLibraries();
-  if (gsapLoaded && window.gsap && window.ScrollTrigger) {
-    initScrollAnimations(sections);
-  } else {
-    initBasicScroll();
-  }
+  // The first background is the LCP candidate, shown and preloaded before GSAP arrives
+  const lcpURL = showSectionBackground(container.firstElementChild, sections[0]);
+  if (lcpURL) setLCPCandidate(lcpURL);
+
+  // Initialize animations once the block nears the viewport, GSAP is only fetched then
+  whenIntersecting(block, { rootMargin: CONFIG.gsapRootMargin })
+    .then(loadGSAPLibraries)
+    .then((gsapLoaded) => {
+      if (gsapLoaded && window.gsap && window.ScrollTrigger) {
+        initScrollAnimations(sections);
+      } else {
+        initBasicScroll();
+      }
+    });
 }
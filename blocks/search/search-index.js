@@ -0,0 +1,127 @@
+/**
+ * In-memory search index for the search block, shared by the block and its worker.
+ * Every token of the indexed text is stored with all of its suffixes in sorted order,
+ * so a search term is found with a binary search as the prefix of a suffix. That keeps
+ * the substring semantics of the original indexOf scan while only the matching
+ * documents are ranked.
+ */
+
+const TOKEN_SEPARATOR = /[^\p{L}\p{N}]+/u;
+
+function tokenize(text) {
+  return text.split(TOKEN_SEPARATOR).filter((token) => !!token);
+}
+
+/**
+ * Builds the index for the entries of a query index.
+ * @param {Array<Object>} entries query index rows with header, title, description and path
+ * @returns {Object} the search index
+ */
+export function buildSearchIndex(entries) {
+  const docs = entries.map((result) => ({
+    header: (result.header || result.title || '').toLowerCase(),
+    meta: `${result.title} ${result.description} ${(result.path || '').split('/').pop()}`.toLowerCase(),
+  }));
+
+  const postings = new Map();
+  docs.forEach(({ header, meta }, id) => {
+    tokenize(`${header} ${meta}`).forEach((token) => {
+      let ids = postings.get(token);
+      if (!ids) {
+        ids = [];
+        postings.set(token, ids);
+      }
+      if (ids[ids.length - 1] !== id) ids.push(id);
+    });
+  });
+
+  const suffixes = [];
+  postings.forEach((ids, token) => {
+    for (let i = 0; i < token.length; i += 1) {
+      suffixes.push([token.slice(i), ids]);
+    }
+  });
+  suffixes.sort(([a], [b]) => {
+    if (a < b) return -1;
+    return a > b ? 1 : 0;
+  });
+
+  return { docs, suffixes };
+}
+
+function lowerBound(suffixes, term) {
+  let low = 0;
+  let high = suffixes.length;
+  while (low < high) {
+    const mid = (low + high) >>> 1; // eslint-disable-line no-bitwise
+    if (suffixes[mid][0] < term) low = mid + 1;
+    else high = mid;
+  }
+  return low;
+}
+
+/**
+ * Collects the ids of the documents that contain any of the terms.
+ * @returns {Array<number>|null} the ids, or null when every document has to be checked
+ */
+function findCandidates(index, searchTerms) {
+  const { suffixes } = index;
+  const candidates = new Set();
+  const complete = searchTerms.every((term) => {
+    // a term spanning several tokens can only be checked against the full text
+    if (TOKEN_SEPARATOR.test(term)) return false;
+    for (let i = lowerBound(suffixes, term); i < suffixes.length; i += 1) {
+      const [suffix, ids] = suffixes[i];
+      if (!suffix.startsWith(term)) break;
+      ids.forEach((id) => candidates.add(id));
+    }
+    return true;
+  });
+  if (!complete) return null;
+  return [...candidates].sort((a, b) => a - b);
+}
+
+function lastIndexOfTerms(text, searchTerms) {
+  let minIdx = -1;
+  searchTerms.forEach((term) => {
+    const idx = text.indexOf(term);
+    if (minIdx < idx) minIdx = idx;
+  });
+  return minIdx;
+}
+
+function compareFound(hit1, hit2) {
+  return hit1.minIdx - hit2.minIdx;
+}
+
+/**
+ * Searches the index.
+ * Hits in the header come before hits in the title, description or page name,
+ * each group ordered by minIdx and then by position in the query index.
+ * @param {Object} index the search index
+ * @param {Array<string>} searchTerms lower case search terms
+ * @returns {Array<number>} positions of the matching entries in the query index
+ */
+export function searchIndex(index, searchTerms) {
+  const { docs } = index;
+  const foundInHeader = [];
+  const foundInMeta = [];
+
+  const candidates = findCandidates(index, searchTerms) || docs.keys();
+  [...candidates].forEach((id) => {
+    let minIdx = lastIndexOfTerms(docs[id].header, searchTerms);
+    if (minIdx >= 0) {
+      foundInHeader.push({ minIdx, id });
+      return;
+    }
+    minIdx = lastIndexOfTerms(docs[id].meta, searchTerms);
+    if (minIdx >= 0) {
+      foundInMeta.push({ minIdx, id });
+    }
+  });
+
+  return [
+    ...foundInHeader.sort(compareFound),
+    ...foundInMeta.sort(compareFound),
+  ].map((item) => item.id);
+}
@@ -0,0 +1,12 @@
+// Builds and queries the search index off the main thread, see search-index.js
+import { buildSearchIndex, searchIndex } from './search-index.js';
+
+let index;
+
+globalThis.addEventListener('message', ({ data }) => {
+  if (data.entries) {
+    index = buildSearchIndex(data.entries);
+  } else {
+    globalThis.postMessage({ id: data.id, ids: searchIndex(index, data.searchTerms) });
+  }
+});
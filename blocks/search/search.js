@@ -3,6 +3,11 @@ import {
   decorateIcons,
   fetchPlaceholders,
 } from '../../scripts/aem.js';
+import ffetch from '../../plusplus/block-party/ffetch.js';
+import { buildSearchIndex, searchIndex } from './search-index.js';
+
+const SEARCH_DEBOUNCE_MS = 150;
+const RESULTS_PER_FRAME = 20;
 
 const searchParams = new URLSearchParams(window.location.search);
 
@@ -83,6 +88,19 @@ export async function fetchData(source) {
   return json.data;
 }
 
+function highlightResult(li, result, searchTerms) {
+  const link = li.querySelector('.search-result-title a');
+  if (link) {
+    link.textContent = result.title;
+    highlightTextElements(searchTerms, [link]);
+  }
+  const description = li.querySelector(':scope > a > p');
+  if (description) {
+    description.textContent = result.description;
+    highlightTextElements(searchTerms, [description]);
+  }
+}
+
 function renderResult(result, searchTerms, titleTag) {
   const li = document.createElement('li');
   const a = document.createElement('a');
@@ -99,18 +117,28 @@ function renderResult(result, searchTerms, titleTag) {
     title.className = 'search-result-title';
     const link = document.createElement('a');
     link.href = result.path;
-    link.textContent = result.title;
-    highlightTextElements(searchTerms, [link]);
     title.append(link);
     a.append(title);
   }
   if (result.description) {
-    const description = document.createElement('p');
-    description.textContent = result.description;
-    highlightTextElements(searchTerms, [description]);
-    a.append(description);
+    a.append(document.createElement('p'));
   }
   li.append(a);
+  highlightResult(li, result, searchTerms);
+  return li;
+}
+
+/**
+ * Returns the list item for a result, reusing the one rendered for an earlier keystroke.
+ */
+function resultItem(config, result, searchTerms, titleTag) {
+  let li = config.items.get(result);
+  if (li) {
+    highlightResult(li, result, searchTerms);
+  } else {
+    li = renderResult(result, searchTerms, titleTag);
+    config.items.set(result, li);
+  }
   return li;
 }
 
@@ -129,18 +157,42 @@ function clearSearch(block) {
   }
 }
 
+/**
+ * Renders the results a frame at a time, keeping list items that are already in place.
+ * A newer search cancels the remaining frames of this one.
+ */
 async function renderResults(block, config, filteredData, searchTerms) {
-  clearSearchResults(block);
   const searchResults = block.querySelector('.search-results');
   const headingTag = searchResults.dataset.h;
+  const render = {};
+  config.render = render;
 
   if (filteredData.length) {
-    searchResults.classList.remove('no-results');
-    filteredData.forEach((result) => {
-      const li = renderResult(result, searchTerms, headingTag);
-      searchResults.append(li);
-    });
+    if (searchResults.classList.contains('no-results')) {
+      clearSearchResults(block);
+      searchResults.classList.remove('no-results');
+    }
+    for (let start = 0; start < filteredData.length; start += RESULTS_PER_FRAME) {
+      if (start > 0) {
+        // eslint-disable-next-line no-await-in-loop
+        await new Promise((resolve) => { requestAnimationFrame(resolve); });
+        if (config.render !== render) return;
+      }
+      filteredData.slice(start, start + RESULTS_PER_FRAME).forEach((result, i) => {
+        const li = resultItem(config, result, searchTerms, headingTag);
+        const current = searchResults.children[start + i];
+        if (current !== li) searchResults.insertBefore(li, current || null);
+      });
+      if (start === 0) {
+        // drop what is left over from the previous search, later frames append
+        const rendered = Math.min(filteredData.length, RESULTS_PER_FRAME);
+        while (searchResults.children.length > rendered) {
+          searchResults.lastElementChild.remove();
+        }
+      }
+    }
   } else {
+    clearSearchResults(block);
     const noResultsMessage = document.createElement('li');
     searchResults.classList.add('no-results');
     noResultsMessage.textContent = config.placeholders.searchNoResults || 'No results found.';
@@ -148,48 +200,108 @@ async function renderResults(block, config, filteredData, searchTerms) {
   }
 }
 
-function compareFound(hit1, hit2) {
-  return hit1.minIdx - hit2.minIdx;
-}
-
-function filterData(searchTerms, data) {
-  const foundInHeader = [];
-  const foundInMeta = [];
-
-  data.forEach((result) => {
-    let minIdx = -1;
-
-    searchTerms.forEach((term) => {
-      const idx = (result.header || result.title).toLowerCase().indexOf(term);
-      if (idx < 0) return;
-      if (minIdx < idx) minIdx = idx;
-    });
-
-    if (minIdx >= 0) {
-      foundInHeader.push({ minIdx, result });
-      return;
-    }
+/**
+ * Returns a search function over the entries, backed by a worker when one can be started.
+ * @param {Array<Object>} entries query index rows
+ * @returns {Function} searchTerms => Promise of the positions of the matching entries
+ */
+function createSearcher(entries) {
+  let index;
+  const searchLocally = async (searchTerms) => {
+    index = index || buildSearchIndex(entries);
+    return searchIndex(index, searchTerms);
+  };
+  if (!window.Worker) return searchLocally;
+
+  let worker;
+  try {
+    worker = new Worker(new URL('./search-worker.js', import.meta.url), { type: 'module' });
+  } catch (error) {
+    return searchLocally;
+  }
+  const pending = new Map();
+  let lastId = 0;
+  worker.addEventListener('message', ({ data }) => {
+    pending.get(data.id)?.resolve(data.ids);
+    pending.delete(data.id);
+  });
+  worker.addEventListener('error', () => {
+    // eg. no module worker support, answer everything on the main thread from now on
+    worker.terminate();
+    worker = null;
+    pending.forEach(({ searchTerms, resolve }) => searchLocally(searchTerms).then(resolve));
+    pending.clear();
+  });
+  worker.postMessage({
+    entries: entries.map(({
+      header, title, description, path,
+    }) => ({
+      header, title, description, path,
+    })),
+  });
 
-    const metaContents = `${result.title} ${result.description} ${result.path.split('/').pop()}`.toLowerCase();
-    searchTerms.forEach((term) => {
-      const idx = metaContents.indexOf(term);
-      if (idx < 0) return;
-      if (minIdx < idx) minIdx = idx;
+  return (searchTerms) => {
+    if (!worker) return searchLocally(searchTerms);
+    return new Promise((resolve) => {
+      lastId += 1;
+      pending.set(lastId, { searchTerms, resolve });
+      worker.postMessage({ id: lastId, searchTerms });
     });
+  };
+}
 
-    if (minIdx >= 0) {
-      foundInMeta.push({ minIdx, result });
-    }
-  });
+const searchIndexes = new Map();
+
+/**
+ * Fetches the entries of a query index, following its pagination.
+ * ffetch adds its own query string, so a sheet parameter is passed through .sheet()
+ * and sources with any other query are fetched whole, as before.
+ * @param {string} source URL of the query index
+ * @returns {Promise<Object[]>} The entries, rejects when the index could not be read
+ */
+async function fetchEntries(source) {
+  const url = new URL(source, window.location.href);
+  const params = [...url.searchParams.keys()];
+  if (params.some((param) => param !== 'sheet')) {
+    const entries = await fetchData(source);
+    if (!entries) throw new Error(`could not load ${source}`);
+    return entries;
+  }
+  // ffetch ends quietly on a failed chunk, which would leave an empty index
+  const fetchOrThrow = async (...args) => {
+    const response = await window.fetch(...args);
+    if (!response.ok) throw new Error(`could not load ${source}: ${response.status}`);
+    return response;
+  };
+  const sheet = url.searchParams.get('sheet');
+  const entries = ffetch(`${url.origin}${url.pathname}`).withFetch(fetchOrThrow);
+  return (sheet ? entries.sheet(sheet) : entries).all();
+}
 
-  return [
-    ...foundInHeader.sort(compareFound),
-    ...foundInMeta.sort(compareFound),
-  ].map((item) => item.result);
+/**
+ * Loads the query index once per source, following its pagination.
+ * @param {string} source URL of the query index
+ * @returns {Promise<Object>} { entries, search }
+ */
+function loadSearchIndex(source) {
+  if (!searchIndexes.has(source)) {
+    searchIndexes.set(source, fetchEntries(source)
+      .then((entries) => ({
+        entries,
+        search: createSearcher(entries),
+      }))
+      .catch((error) => {
+        // let the next keystroke try again
+        searchIndexes.delete(source);
+        throw error;
+      }));
+  }
+  return searchIndexes.get(source);
 }
 
 async function handleSearch(e, block, config) {
   const searchValue = e.target.value;
+  config.searchValue = searchValue;
   searchParams.set('q', searchValue);
   if (window.history.replaceState) {
     const url = new URL(window.location.href);
@@ -198,13 +310,17 @@ async function handleSearch(e, block, config) {
   }
 
   if (searchValue.length < 3) {
+    config.render = null;
     clearSearch(block);
     return;
   }
   const searchTerms = searchValue.toLowerCase().split(/\s+/).filter((term) => !!term);
 
-  const data = await fetchData(config.source);
-  const filteredData = filterData(searchTerms, data);
+  const { entries, search } = await loadSearchIndex(config.source);
+  const ids = await search(searchTerms);
+  // a later keystroke has already started its own search
+  if (config.searchValue !== searchValue) return;
+  const filteredData = ids.map((id) => entries[id]);
   await renderResults(block, config, filteredData, searchTerms);
 }
 
@@ -224,11 +340,25 @@ function searchInput(block, config) {
   input.placeholder = searchPlaceholder;
   input.setAttribute('aria-label', searchPlaceholder);
 
+  let debounce;
   input.addEventListener('input', (e) => {
-    handleSearch(e, block, config);
+    clearTimeout(debounce);
+    debounce = setTimeout(() => {
+      handleSearch(e, block, config).catch((error) => {
+        // eslint-disable-next-line no-console
+        console.error('search failed', error);
+      });
+    }, SEARCH_DEBOUNCE_MS);
   });
 
-  input.addEventListener('keyup', (e) => { if (e.code === 'Escape') { clearSearch(block); } });
+  input.addEventListener('keyup', (e) => {
+    if (e.code === 'Escape') {
+      clearTimeout(debounce);
+      config.searchValue = '';
+      config.render = null;
+      clearSearch(block);
+    }
+  });
 
   return input;
 }
@@ -255,7 +385,7 @@ export default async function decorate(block) {
   const source = block.querySelector('a[href]') ? block.querySelector('a[href]').href : '/query-index.json';
   block.innerHTML = '';
   block.append(
-    searchBox(block, { source, placeholders }),
+    searchBox(block, { source, placeholders, items: new Map() }),
     searchResultsContainer(block),
   );
 
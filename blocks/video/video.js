@@ -4,6 +4,12 @@
  * https://www.hlx.live/developer/block-collection/video
  */
 
+import {
+  observeIntersection,
+  onVisibilityChange,
+  whenIntersecting,
+} from '../../scripts/scheduler.js';
+
 const prefersReducedMotion = window.matchMedia('(prefers-reduced-motion: reduce)');
 
 function embedYoutube(url, autoplay, background) {
@@ -54,6 +60,30 @@ function embedVimeo(url, autoplay, background) {
   return temp.children.item(0);
 }
 
+/**
+ * Plays a background video only while it is on screen and the page is visible.
+ * @param {HTMLVideoElement} video The video
+ */
+function playWhileVisible(video) {
+  let onScreen = false;
+  let pageHidden = document.visibilityState === 'hidden';
+  const update = () => {
+    if (onScreen && !pageHidden) {
+      video.play().catch(() => {});
+    } else {
+      video.pause();
+    }
+  };
+  observeIntersection(video, (entry) => {
+    onScreen = entry.isIntersecting;
+    update();
+  });
+  onVisibilityChange((hidden) => {
+    pageHidden = hidden;
+    update();
+  });
+}
+
 function getVideoElement(source, autoplay, background) {
   const video = document.createElement('video');
   video.setAttribute('controls', '');
@@ -64,8 +94,8 @@ function getVideoElement(source, autoplay, background) {
     video.removeAttribute('controls');
     video.addEventListener('canplay', () => {
       video.muted = true;
-      if (autoplay) video.play();
-    });
+      if (autoplay) playWhileVisible(video);
+    }, { once: true });
   }
 
   const sourceEl = document.createElement('source');
@@ -132,13 +162,9 @@ export default async function decorate(block) {
   }
 
   if (!placeholder || autoplay) {
-    const observer = new IntersectionObserver((entries) => {
-      if (entries.some((e) => e.isIntersecting)) {
-        observer.disconnect();
-        const playOnLoad = autoplay && !prefersReducedMotion.matches;
-        loadVideoEmbed(block, link, playOnLoad, autoplay);
-      }
+    whenIntersecting(block).then(() => {
+      const playOnLoad = autoplay && !prefersReducedMotion.matches;
+      loadVideoEmbed(block, link, playOnLoad, autoplay);
     });
-    observer.observe(block);
   }
 }
@@ -0,0 +1,145 @@
+// Benchmark: the single DOM walk against the code it replaced.
+// tidyDOM's link passes plus the two external image scans are compared with runDomPipeline,
+// and the recursive getTextNodes renderExpressions with the TreeWalker one.
+// Needs a DOM, run with: npm i --no-save jsdom && node plusplus/benchmarks/dom-pipeline.mjs
+/* eslint-disable no-console */
+import { register } from 'node:module';
+
+// the modules import /scripts/... and /plusplus/... by absolute path, resolve those in the repo
+const ROOT = new URL('../../', import.meta.url).href;
+const resolveHook = `export function resolve(specifier, context, next) {
+  const local = /^\\/(scripts|plusplus)\\//.test(specifier);
+  return next(local ? new URL('.' + specifier, ${JSON.stringify(ROOT)}).href : specifier, context);
+}`;
+register(`data:text/javascript,${encodeURIComponent(resolveHook)}`);
+
+const ITERATIONS = 20;
+const SECTIONS = 200;
+
+let JSDOM;
+try {
+  ({ JSDOM } = await import('jsdom'));
+} catch (error) {
+  console.error('jsdom is not installed, run: npm i --no-save jsdom');
+  process.exit(1);
+}
+
+function buildMain() {
+  const section = `
+    <div>
+      <h2>Heading</h2>
+      <p>Some text with a {{greeting, world}} expression and <a href="/page">a link</a>.</p>
+      <p><a class="button" href="https://example.org/out" title="out">external</a></p>
+      <p><a href="/image" title="image"><picture><img src="/a.png" alt=""></picture></a></p>
+      <p><a href="https://images.example.org/photo.jpg">https://images.example.org/photo.jpg</a></p>
+      <ul><li>one</li><li>two</li><li><a href="https://www.example.com/current">current</a></li></ul>
+    </div>`;
+  return `<main>${section.repeat(SECTIONS)}</main>`;
+}
+
+function setGlobals(dom) {
+  globalThis.window = dom.window;
+  globalThis.document = dom.window.document;
+  globalThis.Node = dom.window.Node;
+  globalThis.NodeFilter = dom.window.NodeFilter;
+  globalThis.HTMLElement = dom.window.HTMLElement;
+}
+
+setGlobals(new JSDOM('<main></main>', { url: 'https://www.example.com/' }));
+const { runDomPipeline } = await import('../src/domPipeline.js');
+await import('../src/reModelDom.js');
+const { decorateExternalImages } = await import('../src/externalImage.js');
+const { createExpression, renderExpressions } = await import(
+  '../plugins/expressions/src/expressions.js'
+);
+createExpression('greeting', ({ args }) => `hello ${args}`);
+
+// the link fixes of tidyDOM before the single walk, unchanged
+function legacyTidyLinks() {
+  const links = document.querySelectorAll('a');
+  const containsVisualElements = (link) => link.querySelectorAll('img') || link.querySelector('picture') || link.querySelector('i[class^="icon"], i[class*=" icon"], i[class^="fa"], i[class*=" fa"]');
+  links.forEach((link) => {
+    if (containsVisualElements(link)) {
+      if (link.hasAttribute('title')) {
+        link.removeAttribute('title');
+      }
+    }
+  });
+  const buttonRole = document.querySelectorAll('.button');
+  buttonRole.forEach((button) => {
+    button.setAttribute('role', 'button');
+  });
+  const siteDomain = window.location.hostname;
+  const currentPage = window.location.href;
+  links.forEach((link) => {
+    const linkDomain = new URL(link.href).hostname;
+    if (linkDomain !== siteDomain && !link.href.startsWith('/') && !link.href.startsWith('#')) {
+      link.setAttribute('target', '_blank');
+    }
+  });
+  links.forEach((link) => {
+    if (link.href === currentPage) {
+      link.classList.add('current');
+    }
+  });
+}
+
+// the external image initialisation before the single walk, two scans of main
+function legacyExternalImages(main) {
+  decorateExternalImages(main, '//External Image//');
+  decorateExternalImages(main);
+}
+
+function getTextNodes(root) {
+  const all = [];
+  for (let node = root.firstChild; node; node = node.nextSibling) {
+    if (node.nodeType === Node.TEXT_NODE) all.push(node);
+    else all.push(...getTextNodes(node));
+  }
+  return all;
+}
+
+// renderExpressions before the TreeWalker, every text node is removed and appended again
+function legacyRenderExpressions(root) {
+  const regex = /{{\s*(\w+)\s*(?:,\s*([^}]+))?}}/g;
+  getTextNodes(root).forEach((textNode) => {
+    const text = textNode.textContent;
+    const parent = textNode.parentNode;
+    textNode.remove();
+    let lastIndex = 0;
+    Array.from(text.matchAll(regex)).forEach((match) => {
+      const segmentBeforeMatch = text.slice(lastIndex, match.index);
+      if (segmentBeforeMatch) parent.append(document.createTextNode(segmentBeforeMatch));
+      parent.append(document.createTextNode(`hello ${match[2]?.trim()}`));
+      lastIndex = match.index + match[0].length;
+    });
+    if (lastIndex < text.length) parent.append(document.createTextNode(text.slice(lastIndex)));
+  });
+}
+
+function time(label, fn) {
+  let total = 0;
+  for (let i = 0; i < ITERATIONS; i += 1) {
+    setGlobals(new JSDOM(buildMain(), { url: 'https://www.example.com/current' }));
+    const main = document.querySelector('main');
+    const start = performance.now();
+    fn(main);
+    total += performance.now() - start;
+  }
+  const average = total / ITERATIONS;
+  console.log(`${label}: ${average.toFixed(2)}ms`);
+  return average;
+}
+
+const legacyTidy = time('tidyDOM links + external images, before', (main) => {
+  legacyTidyLinks();
+  legacyExternalImages(main);
+});
+const pipeline = time('tidyDOM links + external images, single walk', (main) => {
+  runDomPipeline(main);
+});
+console.log(`  ${(legacyTidy / pipeline).toFixed(1)}x`);
+
+const legacyExpressions = time('renderExpressions, getTextNodes', legacyRenderExpressions);
+const expressions = time('renderExpressions, TreeWalker', (main) => renderExpressions(main));
+console.log(`  ${(legacyExpressions / expressions).toFixed(1)}x`);
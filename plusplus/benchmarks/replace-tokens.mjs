@@ -0,0 +1,54 @@
+// Micro-benchmark: compiled token substitution against the original replaceAll loop.
+// Run with: node plusplus/benchmarks/replace-tokens.mjs
+/* eslint-disable no-console */
+import {
+  renderTokens,
+  replaceTokensSequentially,
+} from '../src/tokenTemplates.js';
+
+const NAMESPACES = ['meta', 'system', 'page', 'company', 'co', 'profile'];
+const ITERATIONS = 2000;
+
+function buildSiteConfig(size) {
+  const data = {
+    '$co:defaultreviewperiod': 300,
+    '$meta:category': 'none',
+  };
+  for (let i = 0; Object.keys(data).length < size; i += 1) {
+    data[`$${NAMESPACES[i % NAMESPACES.length]}:key${i}$`] = `value number ${i}`;
+  }
+  return data;
+}
+
+function buildPayload(data) {
+  const tokens = Object.keys(data).filter((key) => key.endsWith('$'));
+  const json = {
+    '@context': 'https://schema.org',
+    '@type': 'Organization',
+  };
+  // a JSON-LD sized payload referencing 40 tokens plus some plain text
+  for (let i = 0; i < 40; i += 1) {
+    json[`field${i}`] = `${tokens[(i * 7) % tokens.length]} and some text`;
+  }
+  return JSON.stringify(json, null, '\t');
+}
+
+function time(fn) {
+  const start = performance.now();
+  for (let i = 0; i < ITERATIONS; i += 1) fn();
+  return (performance.now() - start) / ITERATIONS;
+}
+
+[100, 250, 500].forEach((size) => {
+  const data = buildSiteConfig(size);
+  const text = buildPayload(data);
+  if (renderTokens(data, text) !== replaceTokensSequentially(data, text)) {
+    throw new Error(`output differs for ${size} keys`);
+  }
+  const sequential = time(() => replaceTokensSequentially(data, text));
+  const compiled = time(() => renderTokens(data, text));
+  console.log(
+    `${size} keys, ${text.length} chars: replaceAll loop ${(sequential * 1000).toFixed(1)}µs,`
+    + ` compiled ${(compiled * 1000).toFixed(1)}µs (${(sequential / compiled).toFixed(1)}x)`,
+  );
+});
@@ -12,22 +12,86 @@
 
 /* eslint-disable */
 
+const responseCache = new Map();
+
+function abortWith(signal) {
+  const controller = new AbortController();
+  if (signal?.aborted) {
+    controller.abort(signal.reason);
+  } else if (signal) {
+    signal.addEventListener('abort', () => controller.abort(signal.reason), { once: true });
+  }
+  return controller;
+}
+
+const abortPromises = new WeakMap();
+
+function untilAborted(promise, signal) {
+  if (!signal) return promise;
+  if (!abortPromises.has(signal)) {
+    const aborted = new Promise((resolve, reject) => {
+      if (signal.aborted) reject(signal.reason);
+      signal.addEventListener('abort', () => reject(signal.reason), { once: true });
+    });
+    aborted.catch(() => {});
+    abortPromises.set(signal, aborted);
+  }
+  return Promise.race([promise, abortPromises.get(signal)]);
+}
+
+// resolves to the parsed chunk, or null if the sheet could not be read
+function fetchChunk(url, context, offset, signal) {
+  const { chunks, sheet, fetch, cache } = context;
+  const params = new URLSearchParams(`offset=${offset}&limit=${chunks}`);
+  if (sheet) params.append(`sheet`, sheet);
+  const chunkUrl = `${url}?${params.toString()}`;
+  const load = async (options) => {
+    const resp = await fetch(chunkUrl, options);
+    return resp.ok ? resp.json() : null;
+  };
+  if (!cache) return load({ signal });
+
+  // shared between callers, so it is not cancelled by any one of them
+  if (!responseCache.has(chunkUrl)) {
+    const shared = load({});
+    responseCache.set(chunkUrl, shared);
+    shared.then((json) => {
+      if (!json) responseCache.delete(chunkUrl);
+    }, () => responseCache.delete(chunkUrl));
+  }
+  return untilAborted(responseCache.get(chunkUrl), signal);
+}
+
 async function* request(url, context) {
-    const { chunks, sheet, fetch } = context;
-    for (let offset = 0, total = Infinity; offset < total; offset += chunks) {
-      const params = new URLSearchParams(`offset=${offset}&limit=${chunks}`);
-      if (sheet) params.append(`sheet`, sheet);
-      const resp = await fetch(`${url}?${params.toString()}`);
-      if (resp.ok) {
-        const json = await resp.json();
-        total = json.total;
-        for (const entry of json.data) yield entry;
-      } else {
-        return;
-      }
+  const { chunks, concurrency } = context;
+  const controller = abortWith(context.signal);
+  const pending = [];
+  let next = chunks;
+  let total = 0;
+  // keeps up to `concurrency` of the following chunks in flight, once the total is known
+  const prefetch = () => {
+    while (pending.length < concurrency && next < total) {
+      const chunk = fetchChunk(url, context, next, controller.signal);
+      chunk.catch(() => {}); // rejections surface when the chunk is awaited
+      pending.push(chunk);
+      next += chunks;
+    }
+  };
+  try {
+    let json = await fetchChunk(url, context, 0, controller.signal);
+    while (json) {
+      ({ total } = json);
+      for (const entry of json.data) yield entry;
+      // only reached when the consumer wants more than this chunk, eg. not for first()
+      prefetch();
+      json = pending.length ? await pending.shift() : null;
     }
+  } finally {
+    // the consumer stopped early or everything is read, cancel what is still in flight
+    controller.abort();
   }
-  
+}
+
   // Operations:
   
   function withFetch(upstream, context, fetch) {
@@ -72,21 +136,37 @@ async function* request(url, context) {
     }
   }
   
+  function withSignal(upstream, context, signal) {
+    context.signal = signal;
+    return upstream;
+  }
+
+  // opt in to sharing chunk responses between all ffetch calls on the page
+  function withCache(upstream, context, cache = true) {
+    context.cache = cache;
+    return upstream;
+  }
+
+  function concurrency(upstream, context, concurrency) {
+    context.concurrency = concurrency;
+    return upstream;
+  }
+
+  // sliding window: a new entry starts as soon as the oldest one is yielded, results keep their order
   async function* map(upstream, context, fn, maxInFlight = 5) {
     const promises = [];
-    for await (let entry of upstream) {
-      promises.push(fn(entry));
+    for await (const entry of upstream) {
+      const promise = Promise.resolve(fn(entry));
+      promise.catch(() => {}); // rejections surface when the promise is awaited
+      promises.push(promise);
       if (promises.length === maxInFlight) {
-        for (entry of promises) {
-          entry = await entry;
-          if (entry) yield entry;
-        }
-        promises.splice(0, promises.length);
+        const result = await promises.shift();
+        if (result) yield result;
       }
     }
-    for (let entry of promises) {
-      entry = await entry;
-      if (entry) yield entry;
+    while (promises.length) {
+      const result = await promises.shift();
+      if (result) yield result;
     }
   }
   
@@ -102,24 +182,29 @@ async function* request(url, context) {
     return limit(skip(upstream, context, from), context, to - from);
   }
   
-  function follow(upstream, context, name, maxInFlight = 5) {
+  async function* follow(upstream, context, name, maxInFlight = 5) {
     const { fetch, parseHtml } = context;
-    return map(
-      upstream,
-      context,
-      async (entry) => {
-        const value = entry[name];
-        if (value) {
-          const resp = await fetch(value);
-          return {
-            ...entry,
-            [name]: resp.ok ? parseHtml(await resp.text()) : null,
-          };
-        }
-        return entry;
-      },
-      maxInFlight,
-    );
+    const controller = abortWith(context.signal);
+    try {
+      yield* map(
+        upstream,
+        context,
+        async (entry) => {
+          const value = entry[name];
+          if (value) {
+            const resp = await fetch(value, { signal: controller.signal });
+            return {
+              ...entry,
+              [name]: resp.ok ? parseHtml(await resp.text()) : null,
+            };
+          }
+          return entry;
+        },
+        maxInFlight,
+      );
+    } finally {
+      controller.abort();
+    }
   }
   
   async function all(upstream) {
@@ -163,6 +248,9 @@ async function* request(url, context) {
       withFetch: withFetch.bind(null, generator, context),
       withHtmlParser: withHtmlParser.bind(null, generator, context),
       sheet: sheet.bind(null, generator, context),
+      withSignal: withSignal.bind(null, generator, context),
+      withCache: withCache.bind(null, generator, context),
+      concurrency: concurrency.bind(null, generator, context),
     };
   
     return Object.assign(generator, operations, functions);
@@ -185,7 +273,9 @@ async function* request(url, context) {
       /* ignore */
     }
   
-    const context = { chunks, fetch, parseHtml };
+    const context = {
+      chunks, fetch, parseHtml, concurrency: 4, cache: false,
+    };
     const generator = request(url, context);
   
     return assignOperations(generator, context);
@@ -4,15 +4,6 @@ const expressions = new Map();
 
 let regex = DEFAULT_REGEX;
 
-function getTextNodes(root) {
-  const all = [];
-  for (let node = root.firstChild; node; node = node.nextSibling) {
-    if (node.nodeType === Node.TEXT_NODE) all.push(node);
-    else all.push(...getTextNodes(node));
-  }
-  return all;
-}
-
 /**
  * Sets the current expression regex
  * @param newRegex
@@ -32,57 +23,81 @@ export function createExpression(name, renderer) {
   expressions.set(name.toLowerCase(), renderer);
 }
 
-/**
- * Renders expressions
- * @param root The root element to search for expressions
- * @param context The data to pass to the renderer
- */
-export function renderExpressions(root = document.body, context = undefined) {
-  getTextNodes(root).forEach((textNode) => {
-    const text = textNode.textContent;
-    const matches = text.matchAll(regex);
-
-    if (matches) {
-      const parent = textNode.parentNode;
-      textNode.remove();
-
-      let lastIndex = 0;
-
-      Array.from(matches).forEach((match) => {
-        const segmentBeforeMatch = text.slice(lastIndex, match.index);
-        if (segmentBeforeMatch) {
-          parent.append(document.createTextNode(segmentBeforeMatch));
-        }
+function renderTextNode(textNode, matches, root, context) {
+  const text = textNode.textContent;
+  const parent = textNode.parentNode;
+  const fragment = document.createDocumentFragment();
 
-        const [name, args] = match.slice(1);
-        const renderer = expressions.get(name.trim().toLowerCase());
+  let lastIndex = 0;
 
-        if (renderer) {
-          const result = renderer({
-            name,
-            parent,
-            root,
-            context,
-            args: args?.trim(),
-          });
+  matches.forEach((match) => {
+    const segmentBeforeMatch = text.slice(lastIndex, match.index);
+    if (segmentBeforeMatch) {
+      fragment.append(document.createTextNode(segmentBeforeMatch));
+    }
 
-          if (result instanceof HTMLElement) {
-            result.classList.add(name);
-            parent.append(result);
-          } else if (typeof result === 'string') {
-            parent.append(document.createTextNode(result));
-          }
-        } else {
-          // eslint-disable-next-line no-console
-          console.warn(`expression ${name} not found`);
-        }
+    const [name, args] = match.slice(1);
+    const renderer = expressions.get(name.trim().toLowerCase());
 
-        lastIndex = match.index + match[0].length;
+    if (renderer) {
+      const result = renderer({
+        name,
+        parent,
+        root,
+        context,
+        args: args?.trim(),
       });
 
-      if (lastIndex < text.length) {
-        parent.append(document.createTextNode(text.slice(lastIndex)));
+      if (result instanceof HTMLElement) {
+        result.classList.add(name);
+        fragment.append(result);
+      } else if (typeof result === 'string') {
+        fragment.append(document.createTextNode(result));
       }
+    } else {
+      // eslint-disable-next-line no-console
+      console.warn(`expression ${name} not found`);
     }
+
+    lastIndex = match.index + match[0].length;
   });
+
+  if (lastIndex < text.length) {
+    fragment.append(document.createTextNode(text.slice(lastIndex)));
+  }
+  textNode.replaceWith(fragment);
+}
+
+/**
+ * Creates a text node visitor that renders expressions, for use in a single DOM walk.
+ * Text nodes without an expression are left untouched.
+ * @param root The root element passed to the renderers
+ * @param context The data to pass to the renderer
+ * @returns {{ text: Function }} visitor returning the change to make, if any
+ */
+export function createExpressionVisitor(root = document.body, context = undefined) {
+  return {
+    name: 'expressions',
+    text: (textNode) => {
+      const matches = [...textNode.textContent.matchAll(regex)];
+      if (!matches.length) return undefined;
+      return () => renderTextNode(textNode, matches, root, context);
+    },
+  };
+}
+
+/**
+ * Renders expressions
+ * @param root The root element to search for expressions
+ * @param context The data to pass to the renderer
+ */
+export function renderExpressions(root = document.body, context = undefined) {
+  const visitor = createExpressionVisitor(root, context);
+  const changes = [];
+  const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+  for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+    const change = visitor.text(node);
+    if (change) changes.push(change);
+  }
+  changes.forEach((change) => change());
 }
@@ -1,8 +1,49 @@
 /* eslint-disable import/prefer-default-export */
 /* eslint-disable no-console */
+/* eslint-disable import/no-absolute-path */
+/* eslint-disable import/no-unresolved */
+import { getPerfMeasures } from '/scripts/aem.js';
+
+const WATERFALL_COLORS = {
+  phase: '#6a5acd',
+  block: '#2e8b57',
+  css: '#daa520',
+  import: '#4682b4',
+  decorate: '#cd5c5c',
+  fetch: '#808080',
+};
+
+// one row per measure, bars placed on a shared time axis from navigation start
+function renderWaterfall() {
+  const measures = getPerfMeasures();
+  if (!measures.length) {
+    return '<p>No measures, add ?perf=on to the URL</p>';
+  }
+  const total = Math.max(...measures.map(({ start, duration }) => start + duration));
+  const rows = measures.map(({
+    kind, name, start, duration,
+  }) => {
+    const left = (start / total) * 100;
+    const width = Math.max((duration / total) * 100, 0.2);
+    const title = `${Math.round(start)}ms +${Math.round(duration)}ms`;
+    const bar = `position: absolute; top: 3px; height: 10px; left: ${left}%; width: ${width}%;`
+      + ` background: ${WATERFALL_COLORS[kind] || 'black'};`;
+    return `<div style="display: flex; font-size: 12px; line-height: 16px;">
+      <span style="flex: 0 0 40%; overflow: hidden; white-space: nowrap;">${kind} ${name}</span>
+      <span style="flex: 1; position: relative;" title="${title}"><span style="${bar}"></span></span>
+    </div>`;
+  }).join('');
+  return `<p>${measures.length} measures over ${Math.round(total)}ms</p>${rows}`;
+}
+
 function toggleDebugPanel() {
   const debugPanel = document.getElementById('debug-panel');
-  debugPanel.style.display = debugPanel.style.display === 'block' ? 'none' : 'block';
+  const show = debugPanel.style.display !== 'block';
+  if (show) {
+    // blocks keep loading after the panel is built, so the waterfall is drawn on opening
+    debugPanel.querySelector('#debug-panel-waterfall').innerHTML = renderWaterfall();
+  }
+  debugPanel.style.display = show ? 'block' : 'none';
 }
 let jsonLdString;
 let dcString;
@@ -52,6 +93,7 @@ function createDebugPanel() {
       content = `<h3>Unmatched Replaceable Tokens</h3>${content}`;
     }
   }
+  content += '<h3>Performance</h3><div id="debug-panel-waterfall"></div>';
   content += '<h3>site configuration</h3>';
   // eslint-disable-next-line no-restricted-syntax, guard-for-in
   for (const key in window.siteConfig) {
@@ -0,0 +1,62 @@
+// Single pass DOM processing.
+// Modules register visitors instead of each running their own querySelectorAll over the page,
+// runDomPipeline then walks the tree once with a TreeWalker and calls every visitor per node.
+// Visitors only read during the walk, they return a function for any change they need and
+// those run together once the walk is done, so the walker never sees a half changed tree.
+
+const visitors = [];
+
+/**
+ * Registers a visitor for runDomPipeline.
+ * @param {Object} visitor { name, element(node), text(node) }, element and text are optional;
+ * each returns undefined when the node needs no change, or a function that makes the change
+ */
+export function registerDomVisitor(visitor) {
+  visitors.push(visitor);
+}
+
+/**
+ * @returns {Array<Object>} the registered visitors, in registration order
+ */
+export function getDomVisitors() {
+  return [...visitors];
+}
+
+/**
+ * Walks root once, elements and, when a visitor wants them, text nodes,
+ * calling the registered visitors.
+ * @param {Element} [root] The element to walk, main by default
+ * @param {Array<Object>} [pipeline] The visitors to run, all registered ones by default
+ * @returns {Object} { nodes, changes, time } nodes visited, changes applied, milliseconds
+ */
+export function runDomPipeline(root = document.querySelector('main'), pipeline = visitors) {
+  const stats = { nodes: 0, changes: 0, time: 0 };
+  if (!root) return stats;
+  const start = performance.now();
+
+  const elementVisitors = pipeline.filter((visitor) => visitor.element);
+  const textVisitors = pipeline.filter((visitor) => visitor.text);
+  const changes = [];
+  // text nodes are only walked when a visitor wants them
+  const whatToShow = textVisitors.length
+    // eslint-disable-next-line no-bitwise
+    ? NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT
+    : NodeFilter.SHOW_ELEMENT;
+  const walker = document.createTreeWalker(root, whatToShow);
+  for (let node = walker.currentNode; node; node = walker.nextNode()) {
+    stats.nodes += 1;
+    const isText = node.nodeType === Node.TEXT_NODE;
+    (isText ? textVisitors : elementVisitors).forEach((visitor) => {
+      const change = isText ? visitor.text(node) : visitor.element(node);
+      if (change) changes.push(change);
+    });
+  }
+  changes.forEach((change) => change());
+
+  stats.changes = changes.length;
+  stats.time = performance.now() - start;
+  window.cmsplus?.debug?.(
+    `DOM pipeline: ${stats.nodes} nodes, ${stats.changes} changes, ${stats.time.toFixed(1)}ms`,
+  );
+  return stats;
+}
@@ -2,8 +2,11 @@
 /* eslint-disable import/no-absolute-path */
 // External image handling, part of block-party; but modified to be a plugin for PlusPlus
 import {
+  buildOptimizedPicture,
   createOptimizedPicture as libCreateOptimizedPicture,
+  getImageDimensions,
 } from '/scripts/aem.js';
+import { registerDomVisitor } from './domPipeline.js';
 
 /**
  * Gets the extension of a URL.
@@ -73,6 +76,32 @@ export function appendQueryParams(url, params) {
   return url.toString();
 }
 
+/*
+   * Builds the picture of an absolute image URL
+   * @param {URL} url The image URL
+   * @param {string} alt The image alt text
+   * @param {boolean} eager Whether to load the image eagerly
+   * @param {object[]} breakpoints The breakpoints to use
+   * @param {object} options sizes, width, height and lcp, see libCreateOptimizedPicture
+   * @param {URLSearchParams} params Query params applied over the generated width and format
+   * @returns {Element} The picture element
+   * @private
+   */
+function buildExternalPicture(url, alt, eager, breakpoints, options, params) {
+  const { pathname } = url;
+  const ext = pathname.substring(pathname.lastIndexOf('.') + 1);
+  const urlFor = (width, format) => {
+    const rendition = new URL(url);
+    appendQueryParams(rendition, new URLSearchParams({ width, format }));
+    return appendQueryParams(rendition, params);
+  };
+
+  return buildOptimizedPicture(urlFor, ext, alt, eager, breakpoints, {
+    ...getImageDimensions(url.href),
+    ...options,
+  });
+}
+
 /**
    * Creates an optimized picture element for an image.
    * If the image is not an absolute URL, it will be passed to libCreateOptimizedPicture.
@@ -80,50 +109,44 @@ export function appendQueryParams(url, params) {
    * @param {string} alt The image alt text
    * @param {boolean} eager Whether to load the image eagerly
    * @param {object[]} breakpoints The breakpoints to use
+   * @param {object} options sizes, width, height and lcp, see libCreateOptimizedPicture
    * @returns {Element} The picture element
    *
    */
-export function createOptimizedPicture(src, alt = '', eager = false, breakpoints = [{ media: '(min-width: 600px)', width: '2000' }, { width: '750' }]) {
+export function createOptimizedPicture(src, alt = '', eager = false, breakpoints = [{ media: '(min-width: 600px)', width: '2000' }, { width: '750' }], options = {}) {
   const isAbsoluteUrl = /^https?:\/\//i.test(src);
 
   // Fallback to createOptimizedPicture if src is not an absolute URL
-  if (!isAbsoluteUrl) return libCreateOptimizedPicture(src, alt, eager, breakpoints);
-
-  const url = new URL(src);
-  const picture = document.createElement('picture');
-  const { pathname } = url;
-  const ext = pathname.substring(pathname.lastIndexOf('.') + 1);
+  if (!isAbsoluteUrl) return libCreateOptimizedPicture(src, alt, eager, breakpoints, options);
 
-  // webp
-  breakpoints.forEach((br) => {
-    const source = document.createElement('source');
-    if (br.media) source.setAttribute('media', br.media);
-    source.setAttribute('type', 'image/webp');
-    const searchParams = new URLSearchParams({ width: br.width, format: 'webply' });
-    source.setAttribute('srcset', appendQueryParams(url, searchParams));
-    picture.appendChild(source);
-  });
-
-  // fallback
-  breakpoints.forEach((br, i) => {
-    const searchParams = new URLSearchParams({ width: br.width, format: ext });
-
-    if (i < breakpoints.length - 1) {
-      const source = document.createElement('source');
-      if (br.media) source.setAttribute('media', br.media);
-      source.setAttribute('srcset', appendQueryParams(url, searchParams));
-      picture.appendChild(source);
-    } else {
-      const img = document.createElement('img');
-      img.setAttribute('loading', eager ? 'eager' : 'lazy');
-      if (eager) img.setAttribute('fetchpriority', 'high');
-      img.setAttribute('alt', alt);
-      picture.appendChild(img);
-      img.setAttribute('src', appendQueryParams(url, searchParams));
-    }
-  });
+  const params = new URLSearchParams();
+  return buildExternalPicture(new URL(src), alt, eager, breakpoints, options, params);
+}
 
-  return picture;
+/*
+   * Replaces an external image link with a picture element
+   * @param {Element} extImage The link
+   * @private
+   */
+function replaceExternalImage(extImage) {
+  const extImageSrc = extImage.getAttribute('href');
+  const isAbsoluteUrl = /^https?:\/\//i.test(extImageSrc);
+  let extPicture;
+  if (isAbsoluteUrl) {
+    /* the query params of the link win over the generated width and format */
+    const extImageUrl = new URL(extImageSrc);
+    extPicture = buildExternalPicture(
+      extImageUrl,
+      '',
+      false,
+      [{ media: '(min-width: 600px)', width: '2000' }, { width: '750' }],
+      {},
+      extImageUrl.searchParams,
+    );
+  } else {
+    extPicture = libCreateOptimizedPicture(extImageSrc);
+  }
+  extImage.parentNode.replaceChild(extPicture, extImage);
 }
 
 /*
@@ -138,34 +161,30 @@ export function decorateExternalImages(ele, deliveryMarker) {
   const extImages = ele.querySelectorAll('a');
   extImages.forEach((extImage) => {
     if (isExternalImage(extImage, deliveryMarker)) {
-      const extImageSrc = extImage.getAttribute('href');
-      const extPicture = createOptimizedPicture(extImageSrc);
-
-      /* copy query params from link to img */
-      const extImageUrl = new URL(extImageSrc);
-      const {
-        searchParams,
-      } = extImageUrl;
-      extPicture.querySelectorAll('source, img').forEach((child) => {
-        if (child.tagName === 'SOURCE') {
-          const srcset = child.getAttribute('srcset');
-          if (srcset) {
-            child.setAttribute('srcset', appendQueryParams(new URL(srcset, extImageSrc), searchParams));
-          }
-        } else if (child.tagName === 'IMG') {
-          const src = child.getAttribute('src');
-          if (src) {
-            child.setAttribute('src', appendQueryParams(new URL(src, extImageSrc), searchParams));
-          }
-        }
-      });
-      extImage.parentNode.replaceChild(extPicture, extImage);
+      replaceExternalImage(extImage);
     }
   });
 }
+
+/*
+   * Visitor for the single DOM walk, see domPipeline.js
+   * Links marked with the delivery marker, or whose text is an image URL, become pictures.
+   * @param {string} deliveryMarker The marker for external images
+   * @returns {object} The visitor
+   */
+export function createExternalImageVisitor(deliveryMarker = '//External Image//') {
+  return {
+    name: 'external images',
+    element: (element) => {
+      if (!isExternalImage(element, deliveryMarker)) return undefined;
+      return () => replaceExternalImage(element);
+    },
+  };
+}
+
 export function initializeExternalImage() {
-  decorateExternalImages(document.querySelector('main'), '//External Image//');
-  decorateExternalImages(document.querySelector('main'));
+  // one visitor covers both the marked links and bare image URLs, isExternalImage checks both
+  registerDomVisitor(createExternalImageVisitor('//External Image//'));
 }
 
 initializeExternalImage();
@@ -3,7 +3,7 @@ import {
   replaceTokens,
   convertToISODate,
   getConfigTruth,
-  readVariables,
+  loadConfigLayers,
 } from './variables.js';
 
 export function extractJsonLd(parsedJson) {
@@ -73,9 +73,7 @@ export async function createJSON() {
     let profileConfig = window.siteConfig?.['$meta:author$'];
     if (profileConfig) {
       profileConfig = profileConfig.replaceAll(' ', '-').toLowerCase();
-      await readVariables(
-        `${window.location.origin}/profiles/${profileConfig}.json`,
-      );
+      await loadConfigLayers([`/profiles/${profileConfig}.json`]);
     }
   }
   if (window.siteConfig?.['$meta:command$']) {
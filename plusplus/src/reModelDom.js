@@ -1,6 +1,10 @@
 /* eslint-disable max-len */
 /* eslint-disable guard-for-in */
 /* eslint-disable no-restricted-syntax */
+/* eslint-disable import/no-absolute-path */
+/* eslint-disable import/no-unresolved */
+import { getImageDimensions } from '/scripts/aem.js';
+import { registerDomVisitor, runDomPipeline } from './domPipeline.js';
 
 export function removeMeta() {
   const keepMetadataNames = [
@@ -40,13 +44,26 @@ export function removeCommentBlocks() {
 }
 
 function DynamicSVGWidthHeight() {
-  // Add dynamic width and height to all SVG image
-  const imgSvg = document.querySelectorAll('img[src$=".svg"]');
+  // Add the intrinsic width and height to SVG images that have none, from the URL when it
+  // says, otherwise from naturalWidth once loaded, which unlike clientWidth needs no layout
+  const imgSvg = document.querySelectorAll('img[src$=".svg"]:not([width])');
   imgSvg.forEach((img) => {
-    const imgWidth = img.clientWidth;
-    const imgHeight = img.clientHeight;
-    img.setAttribute('width', imgWidth);
-    img.setAttribute('height', imgHeight);
+    const setSize = ({ width, height }) => {
+      if (width && height) {
+        img.setAttribute('width', width);
+        img.setAttribute('height', height);
+      }
+    };
+    const dimensions = getImageDimensions(img.getAttribute('src'));
+    if (dimensions) {
+      setSize(dimensions);
+    } else if (img.complete) {
+      setSize({ width: img.naturalWidth, height: img.naturalHeight });
+    } else {
+      img.addEventListener('load', () => {
+        setSize({ width: img.naturalWidth, height: img.naturalHeight });
+      }, { once: true });
+    }
   });
 }
 
@@ -96,6 +113,37 @@ function inject() {
   }
 }
 
+function hasVisualElements(link) {
+  return link.querySelector('img, picture, i[class^="icon"], i[class*=" icon"], i[class^="fa"], i[class*=" fa"]');
+}
+
+// link and button fixes made by tidyDOM, as part of the single DOM walk
+const tidyLinksVisitor = {
+  name: 'tidy links',
+  element: (element) => {
+    const isLink = element.tagName === 'A';
+    // Remove title from link with images
+    const removeTitle = isLink && element.hasAttribute('title') && hasVisualElements(element);
+    // Add button="role" to every link with button class
+    const addRole = element.classList.contains('button') && element.getAttribute('role') !== 'button';
+    // Open external link in the new window, the href is already resolved so the hostname is enough
+    const addTarget = isLink && element.hasAttribute('href')
+      && element.hostname !== window.location.hostname
+      && element.getAttribute('target') !== '_blank';
+    // Add current class to any current visited
+    const addCurrent = isLink && element.href === window.location.href
+      && !element.classList.contains('current');
+    if (!removeTitle && !addRole && !addTarget && !addCurrent) return undefined;
+    return () => {
+      if (removeTitle) element.removeAttribute('title');
+      if (addRole) element.setAttribute('role', 'button');
+      if (addTarget) element.setAttribute('target', '_blank');
+      if (addCurrent) element.classList.add('current');
+    };
+  },
+};
+registerDomVisitor(tidyLinksVisitor);
+
 // tidyDOM is the slow fixes to the Dom that do not change styes or view
 export async function tidyDOM() {
   window.cmsplus.debug('Tidy DOM');
@@ -105,44 +153,7 @@ export async function tidyDOM() {
   if (document.querySelector('coming-soon')) {
     DocumentFragment.body.classList.add('hide');
   }
-  // ---- Remove title from link with images ----- //
-  // Find all <a> tags in the document
-  const links = document.querySelectorAll('a');
-  const containsVisualElements = (link) => link.querySelectorAll('img') || link.querySelector('picture') || link.querySelector('i[class^="icon"], i[class*=" icon"], i[class^="fa"], i[class*=" fa"]');
-
-  // Remove title from link
-  links.forEach((link) => {
-    if (containsVisualElements(link)) {
-      // If a title attribute exists, remove it
-      if (link.hasAttribute('title')) {
-        link.removeAttribute('title');
-      }
-    }
-  });
-
-  // Add button="role" to every blink with button class
-  const buttonRole = document.querySelectorAll('.button');
-  buttonRole.forEach((button) => {
-    button.setAttribute('role', 'button');
-  });
-
-  // Add target blank to all external website linked on the website
-  // Get the current site's domain
-  const siteDomain = window.location.hostname;
-  const currentPage = window.location.href;
-
-  // Open external link in the new window
-  links.forEach((link) => {
-    const linkDomain = new URL(link.href).hostname;
-    if (linkDomain !== siteDomain && !link.href.startsWith('/') && !link.href.startsWith('#')) {
-      link.setAttribute('target', '_blank');
-    }
-  });
-  // Add current class to any current visited
-  links.forEach((link) => {
-    if (link.href === currentPage) {
-      link.classList.add('current');
-    }
-  });
+  // one walk over main for every registered visitor, eg. links and external images
+  runDomPipeline(document.querySelector('main'));
   window.cmsplus.debug('Tidy DOM complete');
 }
@@ -18,6 +18,7 @@ import {
   handleMetadataJsonLd,
   createJSON,
 } from './jsonHandler.js';
+import { measureStart } from '/scripts/aem.js';
 import { } from './externalImage.js';
 import {} from '/config/config.js';
 import {} from '/plusplus/src/clientExpressions.js';
@@ -31,6 +32,16 @@ function debugMessage(message) {
 }
 function noAction() {
 }
+
+// runs one init phase, measured as cmsplus:phase:<name> when instrumentation is on
+async function timePhase(name, phase) {
+  const endPhase = measureStart('phase', name);
+  try {
+    return await phase();
+  } finally {
+    endPhase();
+  }
+}
 export async function initializeSiteConfig() {
 // Determine the environment and locality based on the URL
   const getEnvironment = () => {
@@ -91,17 +102,17 @@ export async function initializeSiteConfig() {
   window.cmsplus.callbackAfter3SecondsChain.push(noAction); // set up nop.
   window.cmsplus.callbackPageLoadChain.push(noAction); // set up nop.
   possibleMobileFix('hero');
-  await constructGlobal();
-  swiftChangesToDOM();
-  await createJSON();
-  await initializeClientConfig();
+  await timePhase('constructGlobal', constructGlobal);
+  await timePhase('swiftChangesToDOM', swiftChangesToDOM);
+  await timePhase('createJSON', createJSON);
+  await timePhase('initializeClientConfig', initializeClientConfig);
   if (window.cmsplus.environment === 'preview') {
     import('./debugPanel.js');
   }
   // all configuration completed, make any further callbacks from here
-  await tidyDOM();
-  await handleMetadataJsonLd();
-  await window.cmsplus?.callbackMetadataTracker?.();
+  await timePhase('tidyDOM', tidyDOM);
+  await timePhase('handleMetadataJsonLd', handleMetadataJsonLd);
+  await timePhase('metadataTracker', async () => window.cmsplus?.callbackMetadataTracker?.());
   if (window.cmsplus.environment === 'preview') {
     window.cmsplus.callbackCreateDebugPanel?.();
   }
@@ -112,4 +123,7 @@ export async function initializeSiteConfig() {
   }
   window.cmsplus.debug('site config initialized');
 }
-await initializeSiteConfig();
+
+// pages with <meta name="config-loading" content="deferred"> do not wait for the config
+// sheets, see loadConfigLayers; the DOM phases always finish before the page is decorated
+await timePhase('initializeSiteConfig', initializeSiteConfig);
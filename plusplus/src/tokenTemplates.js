@@ -0,0 +1,174 @@
+// Compiled substitution of $namespace:name$ tokens, used by replaceTokens.
+// A source string is scanned once for its '$' delimiters and the result is cached,
+// each token is then resolved with a Set/Map lookup instead of one replaceAll per key.
+
+const MAX_CACHED_TEMPLATES = 64;
+
+const templates = new Map();
+const dictionaries = new WeakMap();
+
+/**
+ * The original algorithm: one replaceAll over the whole text for every key, in key order.
+ * Kept as the reference behaviour and as the fallback for inputs the compiled path
+ * cannot reproduce exactly.
+ * @param {Object} data token to value map
+ * @param {string} text the text to substitute
+ * @returns {string} the substituted text
+ */
+export function replaceTokensSequentially(data, text) {
+  let ret = text;
+  // eslint-disable-next-line no-restricted-syntax, guard-for-in
+  for (const key in data) {
+    if (Object.hasOwnProperty.call(data, key)) {
+      const item = key;
+      const value = data[item];
+      ret = ret.replaceAll(item, value);
+    }
+  }
+  return ret;
+}
+
+/**
+ * Compiles a source string into the positions of its '$' delimiters and the candidate
+ * token between each pair of neighbouring delimiters.
+ * @param {string} text the source string
+ * @returns {Object} { text, dollars, candidates }
+ */
+export function compileTemplate(text) {
+  let template = templates.get(text);
+  if (template) {
+    return template;
+  }
+  const dollars = [];
+  for (let i = text.indexOf('$'); i !== -1; i = text.indexOf('$', i + 1)) {
+    dollars.push(i);
+  }
+  const candidates = dollars.slice(1).map((end, i) => text.slice(dollars[i], end + 1));
+  template = { text, dollars, candidates };
+  if (templates.size >= MAX_CACHED_TEMPLATES) {
+    templates.delete(templates.keys().next().value);
+  }
+  templates.set(text, template);
+  return template;
+}
+
+/**
+ * Builds the lookup structures for the keys of a data object.
+ * siteConfig only ever gains keys, so the cached dictionary is reused while the key count
+ * and the newest key are unchanged.
+ * Well formed keys look like $...$ with no other '$', open keys start with '$' and have no
+ * closing one (eg. '$co:defaultreviewperiod'). Any other key makes the dictionary unsafe.
+ * @param {Object} data token to value map
+ * @returns {Object} the dictionary
+ */
+function getDictionary(data) {
+  const keys = Object.keys(data);
+  const cached = dictionaries.get(data);
+  if (cached && cached.count === keys.length && cached.last === keys[keys.length - 1]) {
+    return cached;
+  }
+  const dictionary = {
+    count: keys.length,
+    last: keys[keys.length - 1],
+    tokens: new Set(),
+    open: [],
+    starts: new Set(),
+    maxLength: 0,
+    safe: true,
+  };
+  keys.forEach((key) => {
+    const inner = key.indexOf('$', 1);
+    if (key[0] !== '$' || (inner !== -1 && inner !== key.length - 1)) {
+      dictionary.safe = false;
+    } else if (inner === -1) {
+      dictionary.open.push(key);
+    } else {
+      dictionary.tokens.add(key);
+    }
+    dictionary.starts.add(key[1]);
+    dictionary.maxLength = Math.max(dictionary.maxLength, key.length);
+  });
+  dictionaries.set(data, dictionary);
+  return dictionary;
+}
+
+/**
+ * Checks whether substituting the matches could create a key that was not in the source,
+ * which the sequential algorithm would go on to replace.
+ * Such a key has to start at the '$' just before a match and run over the substituted value.
+ * @returns {boolean} true when a new key could appear
+ */
+function formsNewKey(template, dictionary, matches, values) {
+  const { text, dollars } = template;
+  return matches.some((first, m) => {
+    if (first === 0) return false;
+    const start = dollars[first - 1] + 1;
+    if (start < dollars[first] && !dictionary.starts.has(text[start])) return false;
+    let built = text.slice(dollars[first - 1], dollars[first]);
+    for (let j = m; j < matches.length; j += 1) {
+      built += values[j];
+      const close = matches[j] + 1;
+      const next = dollars[close + 1];
+      const tail = text.slice(dollars[close] + 1, next === undefined ? text.length : next);
+      const candidate = built + tail;
+      if (dictionary.open.some((key) => candidate.startsWith(key))) return true;
+      if (next === undefined) return false;
+      if (dictionary.tokens.has(`${candidate}$`)) return true;
+      if (candidate.length > dictionary.maxLength || matches[j + 1] !== close + 1) return false;
+      built = candidate;
+    }
+    return false;
+  });
+}
+
+/**
+ * Substitutes tokens using a compiled template.
+ * @param {Object} data token to value map
+ * @param {Object} template from compileTemplate
+ * @returns {string|null} the substituted text, or null when only the sequential
+ * algorithm gives the exact result (overlapping tokens, values containing '$', ...)
+ */
+export function renderTemplate(data, template) {
+  const dictionary = getDictionary(data);
+  if (!dictionary.safe) return null;
+  const { text, dollars, candidates } = template;
+  if (dictionary.open.some((key) => text.includes(key))) return null;
+
+  // matches hold the index in dollars of each token's opening '$'
+  const matches = [];
+  const values = [];
+  for (let i = 0; i < candidates.length; i += 1) {
+    const token = candidates[i];
+    if (dictionary.tokens.has(token)) {
+      // two tokens sharing a '$' are resolved by key order, not position
+      if (matches[matches.length - 1] === i - 1) return null;
+      const value = data[token];
+      if (typeof value === 'function') return null;
+      const stringValue = `${value}`;
+      if (stringValue.includes('$')) return null;
+      matches.push(i);
+      values.push(stringValue);
+    }
+  }
+  if (matches.length === 0) return text;
+  if (formsNewKey(template, dictionary, matches, values)) return null;
+
+  let ret = '';
+  let last = 0;
+  matches.forEach((i, m) => {
+    ret += text.slice(last, dollars[i]) + values[m];
+    last = dollars[i + 1] + 1;
+  });
+  return ret + text.slice(last);
+}
+
+/**
+ * Replaces every key of data found in text with its value.
+ * Gives the same output as replaceTokensSequentially.
+ * @param {Object} data token to value map, normally window.siteConfig
+ * @param {string} text the text to substitute
+ * @returns {string} the substituted text
+ */
+export function renderTokens(data, text) {
+  return renderTemplate(data, compileTemplate(text)) ?? replaceTokensSequentially(data, text);
+}
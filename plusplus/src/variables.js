@@ -1,39 +1,119 @@
 /* eslint-disable no-console */
+import { renderTokens } from './tokenTemplates.js';
+
+const CONFIG_CACHE_KEY = 'cmsplus-config';
+
+function readConfigCache() {
+  try {
+    return JSON.parse(sessionStorage.getItem(CONFIG_CACHE_KEY)) || {};
+  } catch (error) {
+    return {};
+  }
+}
+
+// several loadConfigLayers calls may revalidate at once, each one merges only the layers it
+// loaded into what is stored now, instead of writing back the copy it read earlier
+function writeConfigLayers(layers) {
+  try {
+    const cache = { ...readConfigCache(), ...layers };
+    sessionStorage.setItem(CONFIG_CACHE_KEY, JSON.stringify(cache));
+  } catch (error) {
+    // storage full or disabled, the next page view simply fetches again
+  }
+}
+
+function applyConfigEntries(entries) {
+  entries.forEach(([item, value]) => {
+    window.siteConfig[item] = value;
+  });
+}
+
+/**
+ * Fetches one config sheet and returns its Item/Value pairs.
+ * @param {URL} configUrl The sheet to fetch
+ * @param {string} [etag] ETag of a cached copy, sent as If-None-Match
+ * @returns {Promise<Object|null>} { etag, entries }, or null when the cached copy is current
+ */
+export async function fetchConfigLayer(configUrl, etag) {
+  const response = await fetch(configUrl, etag ? { headers: { 'If-None-Match': etag } } : {});
+  if (response.status === 304) {
+    return null;
+  }
+  if (!response.ok) {
+    throw new Error(`Failed to fetch config: ${response.status} ${response.statusText}`);
+  }
+
+  const jsonData = await response.json();
+  const entries = (jsonData?.data || [])
+    .filter((entry) => entry.Item && entry.Value !== undefined)
+    .map((entry) => [entry.Item, entry.Value]);
+  return { etag: response.headers.get('ETag'), entries };
+}
+
 export async function readVariables(configUrl) {
   if (!configUrl || !(configUrl instanceof URL)) {
     throw new Error('Invalid config URL');
   }
 
   try {
-    const response = await fetch(configUrl);
-    if (!response.ok) {
-      throw new Error(`Failed to fetch config: ${response.status} ${response.statusText}`);
-    }
-
-    const jsonData = await response.json();
-    if (jsonData?.data) {
-      jsonData.data.forEach((entry) => {
-        if (entry.Item && entry.Value !== undefined) {
-          window.siteConfig[entry.Item] = entry.Value;
-        }
-      });
-    }
+    const { entries } = await fetchConfigLayer(configUrl);
+    applyConfigEntries(entries);
   } catch (error) {
     console.warn(`Unable to read config from ${configUrl}:`, error);
   }
 }
 
-export function replaceTokens(data, text) {
-  let ret = text;
-  // eslint-disable-next-line no-restricted-syntax, guard-for-in
-  for (const key in data) {
-    if (Object.hasOwnProperty.call(data, key)) {
-      const item = key;
-      const value = data[item];
-      ret = ret.replaceAll(item, value);
+/**
+ * Loads config sheets in parallel and merges them into window.siteConfig,
+ * later paths overriding earlier ones.
+ * Layers are kept in sessionStorage; when every layer is cached the cached values
+ * are applied straight away and the sheets are revalidated in the background.
+ * Pages with the metadata config-loading: deferred never wait for the network, they use
+ * whichever layers are cached (or none, leaving the defaults) and the fetch only
+ * refreshes the cache for the next page.
+ * @param {Array<string>} configPaths Sheet paths in precedence order
+ * @returns {Promise<Object>} { revalidated }, a promise that settles once every layer
+ * has been fetched or revalidated and the cache written
+ */
+export async function loadConfigLayers(configPaths) {
+  const baseUrl = window.location.origin || 'http://localhost';
+  const cache = readConfigCache();
+  const deferred = document.querySelector('meta[name="config-loading"]')?.content === 'deferred';
+  const cachedLayers = deferred || configPaths.every((path) => cache[path])
+    ? configPaths.map((path) => cache[path]).filter(Boolean)
+    : null;
+
+  const layers = {};
+  const refreshLayer = async (path) => {
+    try {
+      const layer = await fetchConfigLayer(new URL(path, baseUrl), cache[path]?.etag);
+      layers[path] = layer || cache[path];
+    } catch (error) {
+      console.warn(`Failed to load config from ${path}:`, error);
+      // remember missing sheets so they don't stop the cache being used
+      layers[path] = cache[path] ?? { etag: null, entries: [] };
     }
+  };
+  const revalidated = Promise.all(configPaths.map(refreshLayer))
+    .then(() => writeConfigLayers(layers));
+
+  if (cachedLayers) {
+    cachedLayers.forEach((layer) => applyConfigEntries(layer.entries));
+    return { revalidated };
   }
-  return ret;
+  await revalidated;
+  configPaths.forEach((path) => applyConfigEntries(layers[path].entries));
+  return { revalidated };
+}
+
+/**
+ * Replaces the siteConfig tokens found in text, see tokenTemplates.js.
+ * @param {Object} data token to value map
+ * @param {string} text the text to substitute
+ * @returns {string} the substituted text
+ */
+export function replaceTokens(data, text) {
+  return renderTokens(data, text);
 }
 export const months = [
   'january',
@@ -105,30 +185,18 @@ export async function constructGlobal() {
 
   if (window.fetchVariables) {
     try {
-      // Get base URL with fallback
-      const baseUrl = window.location.origin || 'http://localhost';
-
-      // Helper function to safely fetch config
-      const safeReadVariables = async (configPath) => {
-        try {
-          const configUrl = new URL(configPath, baseUrl);
-          await readVariables(configUrl);
-        } catch (error) {
-          console.warn(`Failed to load config from ${configPath}:`, error);
-        }
-      };
-
-      // Load configs in sequence with proper error handling
-      await safeReadVariables('/config/defaults.json');
-      await safeReadVariables('/config/variables.json');
+      // Layers in precedence order, later ones override earlier ones
+      const configPaths = ['/config/defaults.json', '/config/variables.json'];
 
       if (['preview', 'live'].includes(window.cmsplus.environment)) {
-        await safeReadVariables(`/config/variables-${window.cmsplus.environment}.json`);
+        configPaths.push(`/config/variables-${window.cmsplus.environment}.json`);
       }
 
       if (['local', 'dev', 'preprod', 'prod', 'stage'].includes(window.cmsplus.locality)) {
-        await safeReadVariables(`/config/variables-${window.cmsplus.locality}.json`);
+        configPaths.push(`/config/variables-${window.cmsplus.locality}.json`);
       }
+
+      await loadConfigLayers(configPaths);
     } catch (error) {
       console.error('Error loading configurations:', error);
     }
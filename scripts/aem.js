@@ -145,6 +145,80 @@ function sampleRUM(checkpoint, data = {}) {
   }
 }
 
+const PERF_PREFIX = 'cmsplus:';
+const noop = () => {};
+let perfOn;
+
+/**
+ * Performance instrumentation is on for page views selected for RUM, in preview (.aem.page)
+ * and with ?perf=on, ?perf=off turns it off.
+ * @returns {boolean} true when phases are measured
+ */
+function isPerfOn() {
+  if (perfOn === undefined) {
+    const param = new URLSearchParams(window.location.search).get('perf');
+    perfOn = !!window.performance?.measure && (param === 'on' || (param !== 'off'
+      && (!!window.hlx?.rum?.isSelected || window.location.hostname.endsWith('.aem.page'))));
+  }
+  return perfOn;
+}
+
+/**
+ * Starts measuring a phase, recorded as a performance measure named cmsplus:kind:name.
+ * When instrumentation is off this returns a shared no-op and records nothing.
+ * @param {string} kind The kind of phase, eg. phase, block, css, import or decorate
+ * @param {string} name The phase or block name
+ * @returns {Function} ends the measure
+ */
+function measureStart(kind, name) {
+  if (!isPerfOn()) return noop;
+  const label = `${PERF_PREFIX}${kind}:${name}`;
+  const start = performance.now();
+  performance.mark(label);
+  return () => {
+    performance.measure(label, { start, end: performance.now() });
+  };
+}
+
+/**
+ * Lists the recorded measures and the fetch requests made so far, in start order.
+ * Fetches come from resource timing, so fetch itself is never wrapped.
+ * @returns {Array<Object>} { kind, name, start, duration } in milliseconds
+ */
+function getPerfMeasures() {
+  if (!isPerfOn()) return [];
+  const measures = performance.getEntriesByType('measure')
+    .filter((entry) => entry.name.startsWith(PERF_PREFIX))
+    .map((entry) => {
+      const [kind, ...name] = entry.name.slice(PERF_PREFIX.length).split(':');
+      return { kind, name: name.join(':'), start: entry.startTime, duration: entry.duration };
+    });
+  const fetches = performance.getEntriesByType('resource')
+    .filter((entry) => entry.initiatorType === 'fetch')
+    .map((entry) => ({
+      kind: 'fetch',
+      name: new URL(entry.name).pathname,
+      start: entry.startTime,
+      duration: entry.duration,
+    }));
+  return [...measures, ...fetches].sort((a, b) => a.start - b.start);
+}
+
+/**
+ * Sends every measure as one compact 'perf' RUM checkpoint, at most once per page view.
+ * The target holds kind:name@start+duration entries separated by commas.
+ */
+function sendPerfRUM() {
+  if (sendPerfRUM.sent || !isPerfOn()) return;
+  sendPerfRUM.sent = true;
+  const target = getPerfMeasures()
+    .map(({
+      kind, name, start, duration,
+    }) => `${kind}:${name}@${Math.round(start)}+${Math.round(duration)}`)
+    .join(',');
+  if (target) sampleRUM('perf', { source: 'cmsplus', target });
+}
+
 /**
  * Setup block utils.
  */
@@ -258,7 +332,7 @@ function readBlockConfig(block) {
  */
 async function loadCSS(href) {
   return new Promise((resolve, reject) => {
-    if (!document.querySelector(`head > link[href="${href}"]`)) {
+    if (!document.querySelector(`head > link[rel="stylesheet"][href="${href}"]`)) {
       const link = document.createElement('link');
       link.rel = 'stylesheet';
       link.href = href;
@@ -310,54 +384,181 @@ function getMetadata(name, doc = document) {
   return meta || '';
 }
 
+const DEFAULT_BREAKPOINTS = [{ media: '(min-width: 600px)', width: '2000' }, { width: '750' }];
+// widths offered below each breakpoint's width, the browser picks one using sizes
+const IMAGE_WIDTHS = [375, 750, 1200, 2000];
+// most preferred first, the page metadata image-formats (eg. "avif, webp") picks from these
+const IMAGE_FORMATS = [
+  { name: 'avif', type: 'image/avif', format: 'avif' },
+  { name: 'webp', type: 'image/webp', format: 'webply' },
+];
+
+/**
+ * Modern formats offered as picture sources, webp unless the page metadata
+ * image-formats asks for others.
+ * @returns {Array<Object>} { name, type, format } in order of preference
+ */
+function getImageFormats() {
+  if (!getImageFormats.formats) {
+    const names = (getMetadata('image-formats') || 'webp').toLowerCase().split(',')
+      .map((name) => name.trim());
+    getImageFormats.formats = IMAGE_FORMATS.filter(({ name }) => names.includes(name));
+  }
+  return getImageFormats.formats;
+}
+
 /**
- * Returns a picture element with webp and fallbacks
+ * Reads the intrinsic size of an image from its URL, so no layout has to be read.
+ * Media URLs carry it as #width=..&height=.., renditions as ?width=..&height=..
  * @param {string} src The image URL
- * @param {string} [alt] The image alternative text
- * @param {boolean} [eager] Set loading attribute to eager
- * @param {Array} [breakpoints] Breakpoints and corresponding params (eg. width)
- * @returns {Element} The picture element
+ * @returns {Object|null} { width, height }, null when the URL does not say
  */
-function createOptimizedPicture(
-  src,
-  alt = '',
-  eager = false,
-  breakpoints = [{ media: '(min-width: 600px)', width: '2000' }, { width: '750' }],
-) {
+function getImageDimensions(src) {
   const url = new URL(src, window.location.href);
-  const picture = document.createElement('picture');
-  const { pathname } = url;
-  const ext = pathname.substring(pathname.lastIndexOf('.') + 1);
+  const found = [new URLSearchParams(url.hash.slice(1)), url.searchParams]
+    .map((params) => ({
+      width: parseInt(params.get('width'), 10),
+      height: parseInt(params.get('height'), 10),
+    }))
+    .find(({ width, height }) => width > 0 && height > 0);
+  return found || null;
+}
 
-  // webp
-  breakpoints.forEach((br) => {
+/**
+ * Declares the LCP candidate of the page, waitForLCP waits for it instead of the first image.
+ * An image is loaded eagerly with high priority, a URL (eg. a CSS background) is preloaded.
+ * @param {Element|string} candidate The img element or the image URL
+ */
+function setLCPCandidate(candidate) {
+  if (typeof candidate === 'string') {
+    const link = document.createElement('link');
+    link.rel = 'preload';
+    link.as = 'image';
+    link.href = candidate;
+    link.setAttribute('fetchpriority', 'high');
+    link.dataset.lcpCandidate = '';
+    const loaded = () => { link.dataset.lcpCandidate = 'loaded'; };
+    link.addEventListener('load', loaded);
+    link.addEventListener('error', loaded);
+    document.head.append(link);
+    return;
+  }
+  candidate.dataset.lcpCandidate = '';
+  candidate.setAttribute('loading', 'eager');
+  candidate.setAttribute('fetchpriority', 'high');
+  candidate.removeAttribute('decoding');
+}
+
+/**
+ * Builds a picture from a URL builder, see createOptimizedPicture.
+ * @param {Function} urlFor Returns the URL of a rendition, called with (width, format)
+ * @param {string} ext The original format, used for the fallback
+ * @param {string} alt The image alternative text
+ * @param {boolean} eager Set loading attribute to eager
+ * @param {Array} breakpoints Breakpoints and their largest width
+ * @param {Object} options { sizes, width, height, lcp }, see createOptimizedPicture
+ * @returns {Element} The picture element
+ */
+function buildOptimizedPicture(urlFor, ext, alt, eager, breakpoints, options = {}) {
+  const picture = document.createElement('picture');
+  // lazy images can let the browser use their laid out width
+  const sizes = options.sizes || (eager ? '100vw' : 'auto, 100vw');
+  const srcset = (maxWidth, format) => {
+    const widths = IMAGE_WIDTHS.filter((width) => width < maxWidth);
+    return [...widths, maxWidth].map((width) => `${urlFor(width, format)} ${width}w`).join(', ');
+  };
+  const addSource = (br, format, type) => {
     const source = document.createElement('source');
     if (br.media) source.setAttribute('media', br.media);
-    source.setAttribute('type', 'image/webp');
-    source.setAttribute('srcset', `${pathname}?width=${br.width}&format=webply&optimize=medium`);
+    if (type) source.setAttribute('type', type);
+    source.setAttribute('srcset', srcset(Number(br.width), format));
+    source.setAttribute('sizes', sizes);
     picture.appendChild(source);
+  };
+
+  // modern formats
+  getImageFormats().forEach(({ format, type }) => {
+    breakpoints.forEach((br) => addSource(br, format, type));
   });
 
   // fallback
   breakpoints.forEach((br, i) => {
     if (i < breakpoints.length - 1) {
-      const source = document.createElement('source');
-      if (br.media) source.setAttribute('media', br.media);
-      source.setAttribute('srcset', `${pathname}?width=${br.width}&format=${ext}&optimize=medium`);
-      picture.appendChild(source);
+      addSource(br, ext);
     } else {
       const img = document.createElement('img');
       img.setAttribute('loading', eager ? 'eager' : 'lazy');
       if (eager) img.setAttribute('fetchpriority', 'high');
+      else img.setAttribute('decoding', 'async');
       img.setAttribute('alt', alt);
+      if (options.width && options.height) {
+        img.setAttribute('width', options.width);
+        img.setAttribute('height', options.height);
+      }
       picture.appendChild(img);
-      img.setAttribute('src', `${pathname}?width=${br.width}&format=${ext}&optimize=medium`);
+      img.setAttribute('srcset', srcset(Number(br.width), ext));
+      img.setAttribute('sizes', sizes);
+      img.setAttribute('src', urlFor(br.width, ext));
+      if (options.lcp) setLCPCandidate(img);
     }
   });
 
   return picture;
 }
 
+/**
+ * Returns a picture element with modern formats and fallbacks
+ * @param {string} src The image URL
+ * @param {string} [alt] The image alternative text
+ * @param {boolean} [eager] Set loading attribute to eager
+ * @param {Array} [breakpoints] Breakpoints and their largest width, smaller widths
+ * from IMAGE_WIDTHS are offered too
+ * @param {Object} [options] sizes: the sizes attribute, 100vw by default;
+ * width and height: the intrinsic size, read from src when not given;
+ * lcp: declare the image as the LCP candidate
+ * @returns {Element} The picture element
+ */
+function createOptimizedPicture(
+  src,
+  alt = '',
+  eager = false,
+  breakpoints = DEFAULT_BREAKPOINTS,
+  options = {},
+) {
+  const url = new URL(src, window.location.href);
+  const { pathname } = url;
+  const ext = pathname.substring(pathname.lastIndexOf('.') + 1);
+  const urlFor = (width, format) => `${pathname}?width=${width}&format=${format}&optimize=medium`;
+  return buildOptimizedPicture(urlFor, ext, alt, eager, breakpoints, {
+    ...getImageDimensions(src),
+    ...options,
+  });
+}
+
+/**
+ * Rebuilds the lazy pictures of the content with the image pipeline,
+ * keeping their intrinsic size. Eager pictures are left alone, they may already be loading,
+ * and so are art directed ones whose sources point at another image
+ * and external ones served from another origin.
+ * @param {Element} main The container element
+ */
+function decoratePictures(main) {
+  main.querySelectorAll('picture > img[loading="lazy"]').forEach((img) => {
+    const src = img.getAttribute('src');
+    const path = src?.split('?')[0];
+    if (!path || path.endsWith('.svg')) return;
+    if (new URL(src, window.location.href).origin !== window.location.origin) return;
+    const sources = [...img.parentElement.querySelectorAll('source')];
+    if (sources.some((source) => !source.getAttribute('srcset')?.startsWith(path))) return;
+    const options = img.hasAttribute('width') && img.hasAttribute('height')
+      ? { width: img.getAttribute('width'), height: img.getAttribute('height') }
+      : {};
+    const alt = img.getAttribute('alt') || '';
+    const picture = createOptimizedPicture(src, alt, false, DEFAULT_BREAKPOINTS, options);
+    img.parentElement.replaceChildren(...picture.children);
+  });
+}
+
 /**
  * Set template (page structure) and theme (page styles).
  */
@@ -617,25 +818,40 @@ function buildBlock(blockName, content) {
   return blockEl;
 }
 
+// blocks being decorated, settled once they are loaded
+const blocksLoading = new WeakMap();
+
 /**
  * Loads JS and CSS for a block.
+ * If the block is already loading, waits for that to finish.
  * @param {Element} block The block element
  */
 async function loadBlock(block) {
   const status = block.dataset.blockStatus;
-  if (status !== 'loading' && status !== 'loaded') {
+  if (status === 'loading') {
+    await blocksLoading.get(block);
+  } else if (status !== 'loaded') {
     block.dataset.blockStatus = 'loading';
+    let loaded;
+    blocksLoading.set(block, new Promise((resolve) => { loaded = resolve; }));
     const { blockName } = block.dataset;
+    const endBlock = measureStart('block', blockName);
     try {
-      const cssLoaded = loadCSS(`${window.hlx.codeBasePath}/blocks/${blockName}/${blockName}.css`);
+      const endCSS = measureStart('css', blockName);
+      const cssLoaded = loadCSS(`${window.hlx.codeBasePath}/blocks/${blockName}/${blockName}.css`)
+        .then(endCSS);
       const decorationComplete = new Promise((resolve) => {
         (async () => {
           try {
+            const endImport = measureStart('import', blockName);
             const mod = await import(
               `${window.hlx.codeBasePath}/blocks/${blockName}/${blockName}.js`
             );
+            endImport();
             if (mod.default) {
+              const endDecorate = measureStart('decorate', blockName);
               await mod.default(block);
+              endDecorate();
             }
           } catch (error) {
             // eslint-disable-next-line no-console
@@ -649,23 +865,98 @@ async function loadBlock(block) {
       // eslint-disable-next-line no-console
       console.log(`failed to load block ${blockName}`, error);
     }
+    endBlock();
     block.dataset.blockStatus = 'loaded';
+    blocksLoading.delete(block);
+    loaded();
   }
   return block;
 }
 
+/**
+ * Hints the browser to fetch the JS and CSS of a block ahead of loadBlock.
+ * @param {string} blockName The block name
+ */
+function preloadBlock(blockName) {
+  const base = `${window.hlx.codeBasePath}/blocks/${blockName}/${blockName}`;
+  [['modulepreload', `${base}.js`], ['preload', `${base}.css`]].forEach(([rel, href]) => {
+    if (!document.head.querySelector(`link[href="${href}"]`)) {
+      const link = document.createElement('link');
+      link.rel = rel;
+      link.href = href;
+      if (rel === 'preload') link.as = 'style';
+      document.head.append(link);
+    }
+  });
+}
+
+const MAX_CONCURRENT_BLOCKS = 4;
+
 /**
  * Loads JS and CSS for all blocks in a container element.
+ * Blocks are decorated in document order, at most MAX_CONCURRENT_BLOCKS at a time,
+ * and sections are shown in order as soon as all their blocks are loaded.
+ * Blocks named in deferredBlocks don't hold up their section, they are loaded
+ * once they come near the viewport.
  * @param {Element} main The container element
+ * @param {Array} [deferredBlocks] Names of blocks to load on approach
  */
-async function loadBlocks(main) {
-  updateSectionsStatus(main);
-  const blocks = [...main.querySelectorAll('div.block')];
-  for (let i = 0; i < blocks.length; i += 1) {
-    // eslint-disable-next-line no-await-in-loop
-    await loadBlock(blocks[i]);
-    updateSectionsStatus(main);
-  }
+async function loadBlocks(main, deferredBlocks = []) {
+  const sections = [...main.querySelectorAll(':scope > div.section')];
+  const blocks = [...main.querySelectorAll('div.block')]
+    .filter((block) => block.dataset.blockStatus !== 'loaded');
+  new Set(blocks.map((block) => block.dataset.blockName)).forEach(preloadBlock);
+
+  const observer = window.IntersectionObserver && new IntersectionObserver((entries) => {
+    entries.forEach(({ isIntersecting, target }) => {
+      if (isIntersecting) {
+        observer.unobserve(target);
+        loadBlock(target);
+      }
+    });
+  }, { rootMargin: '400px 0px' });
+  const queue = blocks.filter((block) => {
+    if (!observer || !deferredBlocks.includes(block.dataset.blockName)) return true;
+    block.dataset.blockStatus = 'deferred';
+    observer.observe(block);
+    return false;
+  });
+
+  // same rules as updateSectionsStatus, without querying every section after each block
+  const pending = new Map(sections.map((section) => [section, 0]));
+  const sectionOf = (block) => sections.find((section) => section.contains(block));
+  queue.forEach((block) => {
+    const section = sectionOf(block);
+    if (section) pending.set(section, pending.get(section) + 1);
+  });
+  let next = 0;
+  const showSections = () => {
+    while (next < sections.length) {
+      const section = sections[next];
+      if (section.dataset.sectionStatus !== 'loaded') {
+        if (pending.get(section)) {
+          section.dataset.sectionStatus = 'loading';
+          return;
+        }
+        section.dataset.sectionStatus = 'loaded';
+        section.style.display = null;
+      }
+      next += 1;
+    }
+  };
+  showSections();
+
+  const worker = async () => {
+    while (queue.length) {
+      const block = queue.shift();
+      // eslint-disable-next-line no-await-in-loop
+      await loadBlock(block);
+      const section = sectionOf(block);
+      if (section) pending.set(section, pending.get(section) - 1);
+      showSections();
+    }
+  };
+  await Promise.all(Array.from({ length: MAX_CONCURRENT_BLOCKS }, worker));
 }
 
 /**
@@ -728,10 +1019,12 @@ async function waitForLCP(lcpBlocks) {
   if (hasLCPBlock) await loadBlock(block);
 
   document.body.style.display = null;
-  const lcpCandidate = document.querySelector('main img');
+  // a block may have declared its candidate, see setLCPCandidate
+  const lcpCandidate = document.querySelector('[data-lcp-candidate]')
+    || document.querySelector('main img');
 
   await new Promise((resolve) => {
-    if (lcpCandidate && !lcpCandidate.complete) {
+    if (lcpCandidate && !lcpCandidate.complete && lcpCandidate.dataset.lcpCandidate !== 'loaded') {
       lcpCandidate.setAttribute('loading', 'eager');
       lcpCandidate.setAttribute('fetchpriority', 'high');
       lcpCandidate.addEventListener('load', resolve);
@@ -746,23 +1039,30 @@ init();
 
 export {
   buildBlock,
+  buildOptimizedPicture,
   createOptimizedPicture,
   decorateBlock,
   decorateBlocks,
   decorateButtons,
   decorateIcons,
+  decoratePictures,
   decorateSections,
   decorateTemplateAndTheme,
   fetchPlaceholders,
+  getImageDimensions,
   getMetadata,
+  getPerfMeasures,
   loadBlock,
   loadBlocks,
   loadCSS,
   loadFooter,
   loadHeader,
   loadScript,
+  measureStart,
   readBlockConfig,
   sampleRUM,
+  sendPerfRUM,
+  setLCPCandidate,
   setup,
   toCamelCase,
   toClassName,
@@ -1,9 +1,11 @@
 /* eslint-disable import/no-unresolved */
 // eslint-disable-next-line import/no-cycle
-import { sampleRUM } from './aem.js';
+import { sampleRUM, sendPerfRUM } from './aem.js';
 
 // Core Web Vitals RUM collection
 sampleRUM('cwv');
+// plusplus phase, block and fetch timings, one batched checkpoint
+sendPerfRUM();
 
 // add more delayed functionality here
 /* eslint-disable no-restricted-syntax */
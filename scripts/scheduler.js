@@ -0,0 +1,153 @@
+/*
+ * Shared scroll, resize and visibility scheduling for blocks.
+ * One passive listener per event type feeds every subscriber once per animation frame,
+ * all reads run before all writes so blocks never interleave layout reads with style writes.
+ * Intersection observers are shared too, one per set of options, see observeIntersection.
+ */
+
+const subscribers = {
+  scroll: new Set(),
+  resize: new Set(),
+};
+const pendingTypes = new Set();
+let frame = 0;
+
+function runFrame() {
+  frame = 0;
+  const jobs = [];
+  pendingTypes.forEach((type) => jobs.push(...subscribers[type]));
+  pendingTypes.clear();
+
+  // read phase: the viewport is measured once and shared by every subscriber
+  const viewport = {
+    scrollY: window.scrollY,
+    width: window.innerWidth,
+    height: window.innerHeight,
+  };
+  const states = jobs.map((job) => (job.read ? job.read(viewport) : viewport));
+  // write phase
+  jobs.forEach((job, i) => job.write?.(states[i]));
+}
+
+function schedule({ type }) {
+  pendingTypes.add(type);
+  if (!frame) frame = requestAnimationFrame(runFrame);
+}
+
+function subscribe(type, subscriber) {
+  const set = subscribers[type];
+  if (!set.size) window.addEventListener(type, schedule, { passive: true });
+  set.add(subscriber);
+  return () => {
+    set.delete(subscriber);
+    if (!set.size) window.removeEventListener(type, schedule, { passive: true });
+  };
+}
+
+/**
+ * Runs a subscriber at most once per frame after the page scrolled.
+ * @param {Object} subscriber { read(viewport), write(state) }, both optional;
+ * read returns the state passed to write, viewport is { scrollY, width, height }
+ * @returns {Function} unsubscribes
+ */
+export function onScroll(subscriber) {
+  return subscribe('scroll', subscriber);
+}
+
+/**
+ * Runs a subscriber at most once per frame after the window resized.
+ * @param {Object} subscriber { read(viewport), write(state) }, see onScroll
+ * @returns {Function} unsubscribes
+ */
+export function onResize(subscriber) {
+  return subscribe('resize', subscriber);
+}
+
+const visibilityCallbacks = new Set();
+
+function notifyVisibility() {
+  const hidden = document.visibilityState === 'hidden';
+  visibilityCallbacks.forEach((callback) => callback(hidden));
+}
+
+/**
+ * Calls back when the page is hidden or shown again.
+ * @param {Function} callback called with true when the page is hidden
+ * @returns {Function} unsubscribes
+ */
+export function onVisibilityChange(callback) {
+  if (!visibilityCallbacks.size) document.addEventListener('visibilitychange', notifyVisibility);
+  visibilityCallbacks.add(callback);
+  return () => {
+    visibilityCallbacks.delete(callback);
+    if (!visibilityCallbacks.size) {
+      document.removeEventListener('visibilitychange', notifyVisibility);
+    }
+  };
+}
+
+const observers = new Map();
+
+function getObserver(rootMargin, threshold) {
+  const key = `${rootMargin}|${threshold}`;
+  let shared = observers.get(key);
+  if (!shared) {
+    const callbacks = new Map();
+    const observer = new IntersectionObserver((entries) => {
+      entries.forEach((entry) => {
+        [...(callbacks.get(entry.target) || [])].forEach((callback) => callback(entry));
+      });
+    }, { rootMargin, threshold });
+    shared = { observer, callbacks };
+    observers.set(key, shared);
+  }
+  return shared;
+}
+
+/**
+ * Observes an element with the intersection observer shared by all callers
+ * using the same options.
+ * Like a new observer, the callback is called once with the current state,
+ * the other callbacks of an element already observed get that entry again.
+ * @param {Element} element The element to observe
+ * @param {Function} callback called with each IntersectionObserverEntry of the element
+ * @param {Object} [options] { rootMargin, threshold }
+ * @returns {Function} stops observing for this callback
+ */
+export function observeIntersection(element, callback, { rootMargin = '0px', threshold = 0 } = {}) {
+  const { observer, callbacks } = getObserver(rootMargin, threshold);
+  let elementCallbacks = callbacks.get(element);
+  if (!elementCallbacks) {
+    elementCallbacks = new Set();
+    callbacks.set(element, elementCallbacks);
+  } else {
+    observer.unobserve(element);
+  }
+  elementCallbacks.add(callback);
+  observer.observe(element);
+
+  return () => {
+    elementCallbacks.delete(callback);
+    if (!elementCallbacks.size && callbacks.get(element) === elementCallbacks) {
+      callbacks.delete(element);
+      observer.unobserve(element);
+    }
+  };
+}
+
+/**
+ * Resolves the first time the element intersects the viewport, extended by rootMargin.
+ * @param {Element} element The element to wait for
+ * @param {Object} [options] { rootMargin, threshold }, see observeIntersection
+ * @returns {Promise<IntersectionObserverEntry>}
+ */
+export function whenIntersecting(element, options) {
+  return new Promise((resolve) => {
+    const stop = observeIntersection(element, (entry) => {
+      if (entry.isIntersecting) {
+        stop();
+        resolve(entry);
+      }
+    }, options);
+  });
+}
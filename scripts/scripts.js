@@ -8,6 +8,7 @@ import {
   loadFooter,
   decorateButtons,
   decorateIcons,
+  decoratePictures,
   decorateSections,
   decorateBlocks,
   decorateTemplateAndTheme,
@@ -22,7 +23,10 @@ import {
 
 import { } from '/plusplus/src/siteConfig.js';
 
-const LCP_BLOCKS = ['hero']; // add your LCP blocks to the list
+// add your LCP blocks to the list, they can declare their image with setLCPCandidate
+const LCP_BLOCKS = ['hero'];
+// blocks that are loaded when they come near the viewport instead of holding up their section
+const DEFERRED_BLOCKS = ['scroll-hero', 'social-media-feeds', 'galeria-text'];
 const AUDIENCES = {
   mobile: () => window.innerWidth < 600,
   desktop: () => window.innerWidth >= 600,
@@ -82,6 +86,15 @@ async function loadFonts() {
     // do nothing
   }
 }
+/**
+ * Fetches and parses the fragment behind a modal link before it is clicked.
+ * @param {Element} link The modal link
+ */
+async function prefetchModal(link) {
+  const { prefetchFragment } = await import(`${window.hlx.codeBasePath}/blocks/fragment/fragment.js`);
+  prefetchFragment(new URL(link.href, window.location).pathname);
+}
+
 // added for modal handling, see adobe docs
 // eslint-disable-next-line no-unused-vars
 function autolinkModals(element) {
@@ -94,6 +107,14 @@ function autolinkModals(element) {
       openModal(origin.href);
     }
   });
+
+  const prefetchTarget = (e) => {
+    const origin = e.target.closest?.('a[href*="/modals/"]');
+    if (origin) prefetchModal(origin);
+  };
+  // only on intent, pages never pay for modals nobody opens
+  element.addEventListener('pointerover', prefetchTarget, { passive: true });
+  element.addEventListener('focusin', prefetchTarget);
 }
 
 /**
@@ -159,6 +180,7 @@ export function decorateMain(main) {
   // hopefully forward compatible button decoration
   decorateButtons(main);
   decorateIcons(main);
+  decoratePictures(main);
   buildAutoBlocks(main);
   decorateSections(main);
   decorateBlocks(main);
@@ -212,7 +234,7 @@ async function loadEager(doc) {
 async function loadLazy(doc) {
   window.cmsplus.debug('loadLazy');
   const main = doc.querySelector('main');
-  await loadBlocks(main);
+  await loadBlocks(main, DEFERRED_BLOCKS);
   autolinkModals(doc); // added for modal handling, see adobe docs
   const { hash } = window.location;
   const element = hash ? doc.getElementById(hash.substring(1)) : false;